@@ -0,0 +1,239 @@
+"""Render a translated Braille document to a single audio file.
+
+The document is translated line by line in the calling process (through
+the translation memory), and each line is rendered to PCM in a pool of
+worker processes, each with its own AudioSystem. Words use the recorded
+(preferably preprocessed) assets and fall back to cached TTS, exactly like
+AudioSystem.speak, but nothing is played: samples are returned to the
+parent and appended to the output in document order. Only a bounded
+number of lines are in flight, so memory stays flat for any document
+length.
+
+Blocks separated by blank lines (or form feeds) become chapters. WAV
+output carries them as cue points with labels; OGG output (needs the
+optional soundfile package) gets a <output>.chapters.json sidecar.
+
+    python audio_export.py book.txt -o book.wav [--workers 4] [--rate 1.5]
+"""
+import argparse
+import json
+import os
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from audio_system import MIXER_SETTINGS
+
+# Silence inserted between words, lines and chapters, in seconds
+WORD_GAP = 0.15
+LINE_GAP = 0.4
+CHAPTER_GAP = 1.0
+# Lines rendered ahead of the writer, per worker
+LINES_IN_FLIGHT_PER_WORKER = 4
+
+
+# --- Output writers --------------------------------------------------------
+
+class WavWriter:
+    """Streaming 16-bit PCM WAV writer with cue-point chapter markers
+
+    Sizes are patched in on close, so samples go straight to disk.
+    """
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self.markers: List[Tuple[int, str]] = []
+        self.file: BinaryIO = open(path, 'wb')
+        block_align = channels * 2
+        self.file.write(b'RIFF\0\0\0\0WAVE')
+        self.file.write(b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate,
+                                              sample_rate * block_align, block_align, 16))
+        self.file.write(b'data\0\0\0\0')
+        self._data_start = self.file.tell()
+
+    def add_marker(self, label: str):
+        self.markers.append((self.frames, label))
+
+    def write(self, samples):
+        self.file.write(samples.astype('<i2').tobytes())
+        self.frames += len(samples)
+
+    def _marker_chunks(self) -> bytes:
+        if not self.markers:
+            return b''
+        cue = struct.pack('<I', len(self.markers)) + b''.join(
+            struct.pack('<II4sIII', i + 1, frame, b'data', 0, 0, frame)
+            for i, (frame, _) in enumerate(self.markers)
+        )
+        labels = b'adtl'
+        for i, (_, label) in enumerate(self.markers):
+            text = label.encode('utf-8') + b'\0'
+            if len(text) % 2:
+                text += b'\0'
+            labels += b'labl' + struct.pack('<II', 4 + len(text), i + 1) + text
+        return (b'cue ' + struct.pack('<I', len(cue)) + cue +
+                b'LIST' + struct.pack('<I', len(labels)) + labels)
+
+    def close(self):
+        data_size = self.file.tell() - self._data_start
+        if data_size % 2:
+            self.file.write(b'\0')
+        self.file.write(self._marker_chunks())
+        riff_size = self.file.tell() - 8
+        self.file.seek(4)
+        self.file.write(struct.pack('<I', riff_size))
+        self.file.seek(self._data_start - 4)
+        self.file.write(struct.pack('<I', data_size))
+        self.file.close()
+
+
+class OggWriter:
+    """Ogg Vorbis output through soundfile; chapters go to a JSON sidecar"""
+    def __init__(self, path: str, sample_rate: int, channels: int):
+        try:
+            import soundfile
+        except ImportError:
+            raise RuntimeError("OGG export needs the soundfile package; export to .wav instead")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.frames = 0
+        self.markers: List[Tuple[int, str]] = []
+        self.file = soundfile.SoundFile(path, 'w', samplerate=sample_rate, channels=channels,
+                                        format='OGG', subtype='VORBIS')
+
+    def add_marker(self, label: str):
+        self.markers.append((self.frames, label))
+
+    def write(self, samples):
+        self.file.write(samples)
+        self.frames += len(samples)
+
+    def close(self):
+        self.file.close()
+        with open(f"{self.path}.chapters.json", 'w', encoding='utf-8') as f:
+            json.dump([{'start': frame / self.sample_rate, 'title': label}
+                       for frame, label in self.markers], f, ensure_ascii=False, indent=2)
+
+
+def open_writer(path: str, sample_rate: int, channels: int):
+    if path.lower().endswith('.ogg'):
+        return OggWriter(path, sample_rate, channels)
+    return WavWriter(path, sample_rate, channels)
+
+
+# --- Workers ---------------------------------------------------------------
+
+_worker_audio = None
+
+
+def _init_worker(speech_rate: Optional[float]):
+    global _worker_audio
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    from audio_system import AudioSystem
+    _worker_audio = AudioSystem()
+    if speech_rate:
+        _worker_audio.set_speech_rate(speech_rate)
+    _worker_audio.ensure_mixer()
+
+
+def _render_line(text: str) -> Tuple[Optional[bytes], int]:
+    """PCM for one translated line and the number of words without audio"""
+    import numpy as np
+    rate, channels = MIXER_SETTINGS['frequency'], MIXER_SETTINGS['channels']
+    gap = np.zeros((int(WORD_GAP * rate), channels), dtype=np.int16)
+    parts, missing = [], 0
+    for word in text.split():
+        samples = _worker_audio.render_speech(word, 'lg')
+        if samples is None:
+            missing += 1
+            continue
+        parts.extend((samples, gap))
+    if not parts:
+        return None, missing
+    return np.concatenate(parts[:-1]).tobytes(), missing
+
+
+# --- Export ----------------------------------------------------------------
+
+def iter_chapters(lines: Iterator[str]) -> Iterator[Tuple[bool, str]]:
+    """(starts_chapter, braille_line) for each non-empty line"""
+    new_chapter = True
+    for line in lines:
+        if '\f' in line or not line.strip():
+            new_chapter = True
+        line = line.replace('\f', '').strip()
+        if line:
+            yield new_chapter, line
+            new_chapter = False
+
+
+def export_audio(translator, input_path: str, output_path: str,
+                 workers: Optional[int] = None, speech_rate: Optional[float] = None) -> dict:
+    """Translate input_path (UTF-8 Braille) and render it to output_path; returns a summary"""
+    import numpy as np
+    sample_rate, channels = MIXER_SETTINGS['frequency'], MIXER_SETTINGS['channels']
+    if speech_rate is None and translator is not None:
+        speech_rate = translator.settings.speech_rate
+    workers = workers or os.cpu_count() or 1
+    writer = open_writer(output_path, sample_rate, channels)
+    line_gap = np.zeros((int(LINE_GAP * sample_rate), channels), dtype=np.int16)
+    chapter_gap = np.zeros((int(CHAPTER_GAP * sample_rate), channels), dtype=np.int16)
+    summary = {'lines': 0, 'chapters': 0, 'missing_words': 0}
+
+    def write(item):
+        starts_chapter, luganda, future = item
+        pcm, missing = future.result()
+        summary['missing_words'] += missing
+        if starts_chapter:
+            if summary['chapters']:
+                writer.write(chapter_gap)
+            summary['chapters'] += 1
+            writer.add_marker(f"Chapter {summary['chapters']}: {luganda[:60]}")
+        elif summary['lines']:
+            writer.write(line_gap)
+        if pcm is not None:
+            writer.write(np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels))
+        summary['lines'] += 1
+
+    try:
+        with open(input_path, encoding='utf-8-sig') as f, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(speech_rate,)) as pool:
+            pending = deque()
+            for starts_chapter, braille in iter_chapters(f):
+                luganda, _ = translator.engine.translate(braille)
+                pending.append((starts_chapter, luganda, pool.submit(_render_line, luganda)))
+                if len(pending) >= workers * LINES_IN_FLIGHT_PER_WORKER:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
+    finally:
+        writer.close()
+
+    summary['seconds'] = writer.frames / sample_rate
+    return summary
+
+
+if __name__ == "__main__":
+    from braille_core import BrailleTranslator
+
+    parser = argparse.ArgumentParser(description='Render a Braille document to one audio file')
+    parser.add_argument('input', help='UTF-8 Braille text; blank lines separate chapters')
+    parser.add_argument('-o', '--output', required=True, help='.wav or .ogg file')
+    parser.add_argument('--db', default='braille_luganda.db', help='Lexicon database')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--rate', type=float, default=None, help='Speech rate (default: speech_speed setting)')
+    args = parser.parse_args()
+
+    translator = BrailleTranslator(args.db)
+    try:
+        summary = export_audio(translator, args.input, args.output, args.workers, args.rate)
+    finally:
+        translator.close()
+    print(f"Rendered {summary['lines']:,} lines in {summary['chapters']:,} chapters "
+          f"({summary['seconds']:.1f} s of audio) to {args.output}")
+    if summary['missing_words']:
+        print(f"{summary['missing_words']:,} words had no recorded or TTS audio and were skipped")
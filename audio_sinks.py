@@ -0,0 +1,266 @@
+"""Audio output backends for AudioSystem.
+
+AudioSystem decodes and renders speech itself and hands the result to a
+sink, which decides where it goes:
+
+    pygame       the sound card, through the pygame mixer (the default)
+    wav:<path>   a 16-bit WAV file of what would be played: sounds are
+                 mixed on a timeline at their volume, overlapping where
+                 the mixer would play them together, pauses included
+    null         nowhere; plays, frames and timings are counted
+
+The sink is chosen by the audio_output user setting (or AudioSystem's sink
+argument), so headless batch hosts, CI and benchmarks never open a sound
+device. Decoding still uses the pygame mixer, on SDL's dummy driver when
+the sink does not need a device.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+DEFAULT_SINK = 'pygame'
+
+
+class AudioSink(ABC):
+    """Where rendered speech goes. Samples are int16 arrays (frames x channels)"""
+    # Whether the mixer must open a real sound device
+    needs_device = False
+
+    def open(self, sample_rate: int, channels: int):
+        """Called once the mixer format is known, before the first play"""
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    @abstractmethod
+    def play(self, samples, wait: bool = False) -> bool:
+        """Output samples; with wait, return once they have finished"""
+
+    def play_sound(self, sound, wait: bool = False) -> bool:
+        """Output a pygame Sound (decoded assets are kept as Sounds)"""
+        import pygame
+        samples = pygame.sndarray.array(sound)
+        return self.play(samples.reshape(len(samples), -1), wait)
+
+    def queue_sound(self, sound) -> bool:
+        """Play sound right after what is playing, with no gap"""
+        return self.play_sound(sound)
+
+    def drain(self):
+        """Block until everything played or queued has finished"""
+
+    def pause(self, seconds: float):
+        """Silence between segments of one utterance"""
+
+    def stop(self):
+        """Cut off whatever is playing"""
+
+    def close(self):
+        pass
+
+
+class PygameSink(AudioSink):
+    """Plays through the pygame mixer"""
+    needs_device = True
+
+    def __init__(self):
+        # Keeps the playing sound alive until it finishes
+        self._current = None
+        self._channel = None
+
+    def play(self, samples, wait: bool = False) -> bool:
+        import pygame
+        return self.play_sound(pygame.sndarray.make_sound(samples), wait)
+
+    def play_sound(self, sound, wait: bool = False) -> bool:
+        channel = sound.play()
+        self._current, self._channel = sound, channel
+        # Wait for playback to finish
+        while wait and channel and channel.get_busy():
+            time.sleep(0.05)
+        return channel is not None
+
+    def queue_sound(self, sound) -> bool:
+        channel = self._channel
+        if channel is None or not channel.get_busy():
+            return self.play_sound(sound)
+        # A channel holds one queued sound; wait for the slot to free up
+        while channel.get_queue() is not None:
+            time.sleep(0.005)
+        if not channel.get_busy():
+            return self.play_sound(sound)
+        channel.queue(sound)
+        self._current = sound
+        return True
+
+    def drain(self):
+        channel = self._channel
+        while channel and channel.get_busy():
+            time.sleep(0.02)
+
+    def pause(self, seconds: float):
+        time.sleep(seconds)
+
+    def stop(self):
+        import pygame
+        if pygame.mixer.get_init():
+            pygame.mixer.stop()
+
+
+class WavSink(AudioSink):
+    """Mixes everything played into a WAV file, on the mixer's timeline
+
+    A sound starts at the current position and overlaps whatever is still
+    sounding; the position moves on only where callers of the pygame sink
+    block (pause, wait, drain), and a queued sound starts when the last
+    one ends. Time the caller spends outside the sink is not seen.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+        self._lock = threading.Lock()
+        # Where the next sound starts, and where the latest one ends (frames)
+        self._position = 0
+        self._last_end = 0
+        # Mixed frames from the position on, not yet final; int32, so
+        # overlapping sounds can exceed int16 until they are written
+        self._mix = None
+
+    def open(self, sample_rate: int, channels: int):
+        super().open(sample_rate, channels)
+        import numpy as np
+        from audio_export import WavWriter
+        with self._lock:
+            if self.writer is None:
+                self.writer = WavWriter(self.path, sample_rate, channels)
+                self._mix = np.zeros((0, channels), dtype=np.int32)
+
+    def _add(self, samples, wait: bool = False, queued: bool = False) -> bool:
+        import numpy as np
+        samples = np.asarray(samples).reshape(len(samples), -1).astype(np.int32)
+        with self._lock:
+            if self.writer is None:
+                return False
+            start = max(self._position, self._last_end) if queued else self._position
+            end = start + len(samples)
+            missing = end - self._position - len(self._mix)
+            if missing > 0:
+                self._mix = np.concatenate([self._mix, np.zeros((missing, self.channels), np.int32)])
+            offset = start - self._position
+            self._mix[offset:offset + len(samples)] += samples
+            self._last_end = max(self._last_end, end)
+            if wait:
+                self._advance(end)
+        return True
+
+    def _advance(self, position: int):
+        """Move the position on; frames before it are final and written (lock held)"""
+        import numpy as np
+        done = position - self._position
+        if done <= 0:
+            return
+        final = self._mix[:done]
+        self.writer.write(np.clip(final, -32768, 32767).astype(np.int16))
+        if done > len(final):
+            # Silence after every sound has ended
+            self.writer.write(np.zeros((done - len(final), self.channels), np.int16))
+        self._mix = self._mix[done:]
+        self._position = position
+
+    def play(self, samples, wait: bool = False) -> bool:
+        return self._add(samples, wait)
+
+    @staticmethod
+    def _sound_samples(sound):
+        import pygame
+        # The mixer scales a Sound by its volume as it plays
+        samples = pygame.sndarray.array(sound)
+        volume = sound.get_volume()
+        return samples * volume if volume != 1.0 else samples
+
+    def play_sound(self, sound, wait: bool = False) -> bool:
+        return self._add(self._sound_samples(sound), wait)
+
+    def queue_sound(self, sound) -> bool:
+        return self._add(self._sound_samples(sound), queued=True)
+
+    def drain(self):
+        with self._lock:
+            if self.writer is not None:
+                self._advance(self._last_end)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            if self.writer is not None:
+                self._advance(self._position + int(seconds * self.sample_rate))
+
+    def stop(self):
+        # Cut off everything still sounding
+        with self._lock:
+            if self.writer is not None:
+                self._mix = self._mix[:0]
+                self._last_end = self._position
+
+    def close(self):
+        with self._lock:
+            if self.writer is not None:
+                self._advance(self._last_end)
+                self.writer.close()
+                self.writer = None
+
+
+class NullSink(AudioSink):
+    """Discards audio, counting what would have been played"""
+    def __init__(self):
+        self.plays = 0
+        self.frames = 0
+        self.silence_frames = 0
+        self.first_play: Optional[float] = None
+        self.last_play: Optional[float] = None
+        self.sample_rate = 0
+        self._lock = threading.Lock()
+
+    def _count(self, frames: int):
+        now = time.perf_counter()
+        with self._lock:
+            self.plays += 1
+            self.frames += frames
+            if self.first_play is None:
+                self.first_play = now
+            self.last_play = now
+
+    def play(self, samples, wait: bool = False) -> bool:
+        self._count(len(samples))
+        return True
+
+    def play_sound(self, sound, wait: bool = False) -> bool:
+        # Counted from the length, without copying the samples out
+        self._count(round(sound.get_length() * self.sample_rate))
+        return True
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.silence_frames += int(seconds * self.sample_rate)
+
+    @property
+    def seconds(self) -> float:
+        """Duration of everything played, pauses included"""
+        if not self.sample_rate:
+            return 0.0
+        return (self.frames + self.silence_frames) / self.sample_rate
+
+
+def create_sink(spec: Optional[str] = None) -> AudioSink:
+    """Sink for an audio_output value: 'pygame', 'null' or 'wav:<path>'"""
+    spec = (spec or DEFAULT_SINK).strip()
+    kind, _, argument = spec.partition(':')
+    kind = kind.lower()
+    if kind == 'pygame':
+        return PygameSink()
+    if kind == 'null':
+        return NullSink()
+    if kind == 'wav':
+        if not argument:
+            raise ValueError("the wav audio output needs a path: wav:<path>")
+        return WavSink(argument)
+    raise ValueError(f"Unknown audio output {spec!r}; use pygame, null or wav:<path>")
@@ -1,19 +1,94 @@
 from pathlib import Path
-import pygame
-import numpy as np
-from pydub import AudioSegment
-from pydub.effects import normalize
-import tempfile
 from io import BytesIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os
+import re
 import time
-from typing import Optional, List, Dict
-from gtts import gTTS
+from typing import Optional, List, Dict, Tuple
+from audio_sinks import AudioSink, create_sink
+from settings import UserSettings, parse_speech_rate
+
+# pygame, NumPy and gTTS are imported inside the methods that need them so
+# that importing this module stays cheap on headless hosts. Playback goes
+# through an audio sink (see audio_sinks.py) chosen by the audio_output
+# setting.
+
+MIXER_SETTINGS = dict(frequency=22050, size=-16, channels=2, buffer=512)
+# Seconds of silence between the recorded segments of a word
+SEGMENT_GAP = 0.05
+# Long TTS text is spoken in chunks: a short first one, so audio starts
+# after one short round trip, then up to gTTS's own request size
+FIRST_CHUNK_CHARS = 40
+CHUNK_CHARS = 100
+# Chunks synthesized ahead of the one playing
+TTS_LOOKAHEAD = 2
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+
+def _fit(piece: str, limit: int) -> List[str]:
+    """piece split at clause boundaries, then between words, into parts of at most limit"""
+    if len(piece) <= limit:
+        return [piece]
+    parts = []
+    for clause in _CLAUSE_END.split(piece):
+        if len(clause) <= limit:
+            parts.append(clause)
+            continue
+        current = ''
+        for word in clause.split():
+            if current and len(current) + 1 + len(word) > limit:
+                parts.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        if current:
+            parts.append(current)
+    return parts
+
+
+def split_speech(text: str, first_chars: int = FIRST_CHUNK_CHARS,
+                 chunk_chars: int = CHUNK_CHARS) -> List[str]:
+    """Text in chunks for pipelined TTS, split at sentence and clause boundaries
+
+    The first chunk is at most first_chars long (unless its first word is
+    longer), later ones at most chunk_chars; consecutive short sentences
+    and clauses share a chunk.
+    """
+    text = ' '.join(text.split())
+    if not text:
+        return []
+    chunks: List[str] = []
+    current = ''
+    for sentence in _SENTENCE_END.split(text):
+        for part in _fit(sentence, first_chars if not chunks and not current else chunk_chars):
+            limit = first_chars if not chunks else chunk_chars
+            if current and len(current) + 1 + len(part) > limit:
+                chunks.append(current)
+                current = part
+            else:
+                current = f"{current} {part}" if current else part
+    chunks.append(current)
+    return chunks
 
 class AudioSystem:
-    def __init__(self):
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    def __init__(self, settings: Optional[UserSettings] = None, sink: Optional[AudioSink] = None):
         self.audio_cache: Dict[str, str] = {}
+        # Decoded sounds at the current speech rate, keyed by (asset, rate),
+        # so each asset is time-stretched once per rate
+        self.sample_bank: Dict[Tuple[str, float], object] = {}
+        self.settings = settings
+        self.speech_rate = settings.speech_rate if settings else 1.0
+        self.sink = sink or self._configured_sink()
+        self._sink_open = False
+        # Seconds from speak() to the first chunk playing, for the last
+        # text spoken through pipelined TTS
+        self.last_first_audio: Optional[float] = None
+        if settings:
+            settings.subscribe(self._on_setting_changed)
         # Only directly playable formats now
         self.supported_formats = ['.wav', '.mp3', '.ogg']
         self.special_combinations = {
@@ -28,6 +103,9 @@ class AudioSystem:
         self.cache_dir.mkdir(exist_ok=True)
         self.local_audio_dir = Path('audio_files')
         self.local_audio_dir.mkdir(exist_ok=True)
+        # Trimmed, normalized WAVs written by preprocess_audio.py; used in
+        # preference to the recordings when present
+        self.processed_audio_dir = Path('audio_processed')
         self.dot_descriptions = {
             1: "dot 1",
             2: "dot 2",
@@ -36,83 +114,161 @@ class AudioSystem:
             5: "dot 5",
             6: "dot 6"
         }
-        self._current_sound = None  # To hold the sound object
-        
+
+    def _configured_sink(self, spec: Optional[str] = None) -> AudioSink:
+        if spec is None and self.settings:
+            spec = self.settings.get('audio_output')
+        try:
+            return create_sink(spec)
+        except ValueError as e:
+            print(f"{e}; playing through pygame")
+            return create_sink()
+
+    def ensure_mixer(self) -> bool:
+        """Initialize the pygame mixer on first playback and open the sink
+
+        The mixer also decodes the assets; for sinks that do not play to a
+        sound card it runs on SDL's dummy driver.
+        """
+        if not self.sink.needs_device:
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        import pygame
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init(**MIXER_SETTINGS)
+            except pygame.error as e:
+                print(f"Audio mixer initialization failed: {e}")
+                return False
+        if not self._sink_open:
+            rate, _, channels = pygame.mixer.get_init()
+            self.sink.open(rate, channels)
+            self._sink_open = True
+        return True
+
+    def set_sink(self, sink: AudioSink):
+        """Send playback to sink from now on; the previous sink is closed"""
+        previous, self.sink, self._sink_open = self.sink, sink, False
+        previous.close()
+
+    def close(self):
+        """Close the sink (a WAV capture is complete only after this)"""
+        self.sink.close()
+
+    def _on_setting_changed(self, name: str, value: str):
+        if name == 'speech_speed':
+            self.set_speech_rate(parse_speech_rate(value))
+        elif name == 'audio_output':
+            self.set_sink(self._configured_sink(value))
+
+    def set_speech_rate(self, rate: float):
+        """Play speech rate times faster; sounds at other rates are dropped"""
+        self.speech_rate = rate
+        self.sample_bank = {key: sound for key, sound in self.sample_bank.items() if key[1] == rate}
+
+    def _stretch_sound(self, sound):
+        """sound time-stretched to the current speech rate"""
+        if self.speech_rate == 1.0:
+            return sound
+        import pygame
+        from time_stretch import time_stretch
+        samples = pygame.sndarray.array(sound)
+        stretched = time_stretch(samples, self.speech_rate, pygame.mixer.get_init()[0])
+        return pygame.sndarray.make_sound(stretched)
+
+    def load_sound(self, source, key: Optional[str] = None):
+        """Sound for a file (or file object with key) at the current speech rate, from the sample bank"""
+        bank_key = (key or str(source), self.speech_rate)
+        sound = self.sample_bank.get(bank_key)
+        if sound is None:
+            import pygame
+            sound = self._stretch_sound(pygame.mixer.Sound(source if key else str(source)))
+            self.sample_bank[bank_key] = sound
+        return sound
+
     def play_dot_sound(self, dot: int):
         """Generate and play TTS for a single dot"""
         if not hasattr(self, 'dot_descriptions'):
             self.dot_descriptions = {i: f"dot {i}" for i in range(1,7)}
             
-        if dot not in range(1, 7):
+        if dot not in range(1, 7) or not self.ensure_mixer():
             return
-            
+
         try:
-            # Generate TTS audio on-the-fly
-            tts = gTTS(text=self.dot_descriptions[dot], lang='en', slow=False, lang_check=False)
-            
-            # Create in-memory file
-            with BytesIO() as fp:
-                tts.write_to_fp(fp)
-                fp.seek(0)
-            
-                # Load and play sound
-                if pygame.mixer.get_init():  # Check if mixer is initialized
-                    if self._current_sound:  # Stop any currently playing sound
-                        self._current_sound.stop()
-                        
-                # Play the audio
-                sound = pygame.mixer.Sound(fp)
-                sound.play()
-            
-                # Keep reference to prevent garbage collection
-                self._current_sound = sound
+            key = f"dot:{dot}"
+            if (key, self.speech_rate) in self.sample_bank:
+                sound = self.sample_bank[(key, self.speech_rate)]
+            else:
+                from gtts import gTTS
+                # Generate TTS audio once per dot and rate
+                tts = gTTS(text=self.dot_descriptions[dot], lang='en', slow=False, lang_check=False)
+
+                # Create in-memory file
+                with BytesIO() as fp:
+                    tts.write_to_fp(fp)
+                    fp.seek(0)
+                    sound = self.load_sound(fp, key)
+
+            # Stop any currently playing sound, then play this one
+            self.sink.stop()
+            self.sink.play_sound(sound)
             
         except Exception as e:
             print(f"Error generating dot sound: {e}")
             # Fallback to system beep
             try:
-                beep = pygame.mixer.Sound(buffer=bytearray([127]*100))
-                beep.play()
+                import pygame
+                self.sink.play_sound(pygame.mixer.Sound(buffer=bytearray([127]*100)))
             except Exception as beep_error:
                 print(f"Beep fallback failed: {beep_error}")
     
     def play_luganda_audio(self, word: str, volume_boost: float =2.0) -> bool:
+        if not self.ensure_mixer():
+            return False
+
+        processed = self.processed_audio_dir / f"{word.lower()}.wav"
+        if processed.exists():
+            # Already normalized offline, so no boost is needed
+            return self._play_audio_file(processed)
+
+        import pygame
+        import numpy as np
         for ext in ['.wav', '.mp3', '.ogg']:
-            audio_file = self.local_files_dir / f"{word.lower()}{ext}"
+            audio_file = self.local_audio_dir / f"{word.lower()}{ext}"
             if audio_file.exists():
                 try:
-                    sound = pygame.mixer.Sound(audio_file)
+                    sound = self.load_sound(audio_file)
                     
                     #sound.set_volume(min(volume_boost, 3.0))
                     sound_array = pygame.sndarray.array(sound)
                     boosted = np.clip(sound_array * volume_boost, -32768, 32767)
-                    sound = pygame.sndarray.make_sound(boosted.astype(np.int16))
-                    sound.play()
+                    self.sink.play(boosted.astype(np.int16).reshape(len(boosted), -1))
                     return True
                 except Exception as e:
                     print(f"Audio play error: {e}")
                     # Fallback attempt with standard volume
                     try:
-                        sound = pygame.mixer.Sound(audio_file)
-                        sound.play()
+                        self.sink.play_sound(pygame.mixer.Sound(audio_file))
                         return True
                     except:
                         continue
         return False
 
     def _find_audio_file(self, base_name: str) -> Optional[Path]:
-        """Find audio files in supported formats"""
+        """Find audio files in supported formats, preferring processed ones"""
+        processed = self.processed_audio_dir / f"{base_name}.wav"
+        if processed.exists():
+            return processed
         for ext in self.supported_formats:
             file_path = self.local_audio_dir / f"{base_name}{ext}"
             if file_path.exists():
                 return file_path
         return None
 
-    def _play_local_audio(self, text: str) -> bool:
-        """Handle Luganda audio playback with multi-character support"""
+    def _local_audio_files(self, text: str) -> Optional[List[Path]]:
+        """Recorded files that together say text, or None if any part is missing"""
         text = text.lower().strip()
         if not text:
-            return False
+            return None
 
         # Process special cases first
         for combo, parts in self.special_combinations.items():
@@ -121,14 +277,21 @@ class AudioSystem:
         # Split into playable segments
         segments = self._split_to_audio_segments(text)
         if not segments:
+            return None
+        files = [self._find_audio_file(segment) for segment in segments]
+        return None if None in files else files
+
+    def _play_local_audio(self, text: str) -> bool:
+        """Handle Luganda audio playback with multi-character support"""
+        files = self._local_audio_files(text)
+        if not files:
             return False
 
         # Play all segments with small pauses
-        for segment in segments:
-            audio_file = self._find_audio_file(segment)
-            if not audio_file or not self._play_single_file(audio_file):
+        for audio_file in files:
+            if not self._play_single_file(audio_file):
                 return False
-            time.sleep(0.05)  # Small pause between sounds
+            self.sink.pause(SEGMENT_GAP)  # Small pause between sounds
         return True
 
     def _split_to_audio_segments(self, text: str) -> List[str]:
@@ -169,16 +332,12 @@ class AudioSystem:
 
     def _play_single_file(self, filepath: Path) -> bool:
         """Play a single audio file"""
-        if not filepath.exists():
+        if not filepath.exists() or not self.ensure_mixer():
             return False
-            
+
         try:
-            sound = pygame.mixer.Sound(str(filepath))
-            channel = sound.play()
-            
-            # Wait for playback to finish
-            while channel and channel.get_busy():
-                time.sleep(0.05)
+            # Returns once playback has finished
+            self.sink.play_sound(self.load_sound(filepath), wait=True)
             return True
         except Exception as e:
             print(f"Error playing {filepath}: {e}")
@@ -194,10 +353,14 @@ class AudioSystem:
             return self.audio_cache[cache_key]
 
         try:
-            filename = f"tts_{abs(hash(text))}.mp3"
+            # Stable across processes, unlike hash(), so every run and
+            # export worker shares the cached files
+            digest = hashlib.sha1(cache_key.encode('utf-8')).hexdigest()[:20]
+            filename = f"tts_{digest}.mp3"
             filepath = self.cache_dir / filename
             
             if not filepath.exists():
+                from gtts import gTTS
                 tts = gTTS(text=text, lang=lang, slow=False)
                 tts.save(str(filepath))
             
@@ -213,42 +376,119 @@ class AudioSystem:
             return False
             
         # Try pre-recorded audio first
-        audio_file = self.local_audio_dir / f"{text.lower()}.mp3"
-        if audio_file.exists():
+        audio_file = self._find_audio_file(text.lower())
+        if audio_file:
             return self._play_audio_file(audio_file)
         
-        # Fallback to system TTS (you'll need gTTS installed)
-        try:
-            from gtts import gTTS
-            tts = gTTS(text=text, lang=lang, slow=False)
-            temp_file = self.local_audio_dir / "temp_tts.mp3"
-            tts.save(temp_file)
-            return self._play_audio_file(temp_file)
-        except ImportError:
-            print("gTTS not available for TTS fallback")
-            return False
+        # Fallback to TTS (you'll need gTTS installed)
+        return self._play_tts(text, lang)
 
     def _play_audio_file(self, filepath: Path) -> bool:
         """Play a single audio file"""
+        if not self.ensure_mixer():
+            return False
+
         try:
-            sound = pygame.mixer.Sound(str(filepath))
-            sound.play()
-            return True
+            return self.sink.play_sound(self.load_sound(filepath))
         except Exception as e:
             print(f"Error playing audio: {e}")
             return False
         
-    def speak(self, text: str, lang: str = 'lg') -> bool:
+    def speak(self, text: str, lang: str = 'lg', allow_tts: bool = True) -> bool:
         """Main method to speak text with fallback support"""
         # First try local audio files in any supported format
         if lang == 'lg' and self._play_local_audio(text):
             return True
+        if not allow_tts:
+            return False
             
-        # Fallback to TTS
-        tts_file = self.text_to_speech(text, lang)
-        if tts_file:
-            return self._play_single_file(Path(tts_file))
-        return False
+        # Fallback to TTS; long text is synthesized and played chunk by chunk
+        chunks = split_speech(text)
+        if len(chunks) > 1:
+            return self._speak_pipelined(chunks, lang)
+        return self._play_tts(text, lang, wait=True)
+
+    def _play_tts(self, text: str, lang: str, wait: bool = False) -> bool:
+        """Synthesize text (cached per text on disk) and play it, bypassing the sample bank"""
+        if not self.ensure_mixer():
+            return False
+        sound = self._synthesize_chunk(text, lang)
+        if sound is None:
+            return False
+        return self.sink.play_sound(sound, wait)
+
+    def _synthesize_chunk(self, chunk: str, lang: str):
+        """Decoded sound of one TTS chunk, or None (runs on a synthesis thread)"""
+        tts_file = self.text_to_speech(chunk, lang)
+        if not tts_file:
+            return None
+        try:
+            import pygame
+            # One-off sentence audio stays out of the sample bank
+            return self._stretch_sound(pygame.mixer.Sound(tts_file))
+        except Exception as e:
+            print(f"Error decoding {tts_file}: {e}")
+            return None
+
+    def _speak_pipelined(self, chunks: List[str], lang: str) -> bool:
+        """Speak TTS chunks in order, synthesizing up to TTS_LOOKAHEAD ahead of playback
+
+        Each chunk is queued on the sink as soon as it is ready, so it
+        follows the previous one without a gap, and the first one plays
+        after a single short synthesis.
+        """
+        if not self.ensure_mixer():
+            return False
+        started = time.perf_counter()
+        played = 0
+        with ThreadPoolExecutor(TTS_LOOKAHEAD) as pool:
+            pending = deque(pool.submit(self._synthesize_chunk, chunk, lang)
+                            for chunk in chunks[:TTS_LOOKAHEAD])
+            following = len(pending)
+            while pending:
+                sound = pending.popleft().result()
+                if following < len(chunks):
+                    pending.append(pool.submit(self._synthesize_chunk, chunks[following], lang))
+                    following += 1
+                if sound is None:
+                    continue  # a failed chunk is skipped, the rest still play
+                self.sink.queue_sound(sound)
+                if not played:
+                    self.last_first_audio = time.perf_counter() - started
+                played += 1
+        self.sink.drain()
+        return played > 0
+
+    def render_speech(self, text: str, lang: str = 'lg', allow_tts: bool = True):
+        """Samples (int16, frames x channels) that speak would play for text, or None
+
+        With allow_tts False only recorded audio is used.
+        """
+        if not self.ensure_mixer():
+            return None
+
+        import pygame
+        import numpy as np
+        files = self._local_audio_files(text) if lang == 'lg' else None
+        if files:
+            sounds = [self.load_sound(audio_file) for audio_file in files]
+        elif not allow_tts:
+            return None
+        else:
+            # One-off sentence audio stays out of the sample bank
+            tts_file = self.text_to_speech(text, lang)
+            if not tts_file:
+                return None
+            sounds = [self._stretch_sound(pygame.mixer.Sound(tts_file))]
+
+        rate, _, channels = pygame.mixer.get_init()
+        gap = np.zeros((int(SEGMENT_GAP * rate), channels), dtype=np.int16)
+        parts = []
+        for sound in sounds:
+            samples = pygame.sndarray.array(sound)
+            parts.append(samples.reshape(len(samples), -1))
+            parts.append(gap)
+        return np.concatenate(parts[:-1])
 
     def clear_cache(self):
         """Clear all cached audio files"""
@@ -289,4 +529,5 @@ if __name__ == "__main__":
         print("✓ Success!" if success else "✗ Failed")
         time.sleep(1)
     
-    audio.clear_cache()
\ No newline at end of file
+    audio.clear_cache()
+    audio.close()
\ No newline at end of file
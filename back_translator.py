@@ -0,0 +1,113 @@
+"""Luganda to Unicode Braille back-translation.
+
+Whole words from common_words are matched first through a reverse hash
+index; everything else is translated by greedy longest match over the
+letters and digraphs (ny, ng, gw, ...) known to the forward translator.
+
+    python back_translator.py lesson.txt -o lesson.brl
+"""
+import argparse
+import re
+import sys
+from typing import Dict, Iterable, Iterator, Optional
+from translation_engine import TranslationEngine
+
+# Translated words are memoized; real text repeats a small vocabulary, so
+# this is cleared rather than evicted when it grows past the limit
+WORD_CACHE_LIMIT = 200_000
+
+
+def dots_to_braille_char(dots) -> str:
+    """Unicode Braille character for an iterable of dot numbers (1-8)"""
+    return chr(0x2800 + sum(1 << (dot - 1) for dot in dots))
+
+
+class LugandaToBraille:
+    def __init__(self, engine: Optional[TranslationEngine] = None):
+        self.engine = engine or TranslationEngine()
+        self.word_index: Dict[str, str] = {}
+        self.char_map: Dict[str, str] = {}
+        self._word_cache: Dict[str, str] = {}
+        self.reload()
+
+    def reload(self):
+        """Rebuild the reverse indexes from the database and the engine's Braille map"""
+        cursor = self.engine.processor.conn.cursor()
+
+        cursor.execute('SELECT luganda_char, braille_code FROM braille_patterns')
+        char_map = {row[0].lower(): row[1] for row in cursor.fetchall()}
+        # The engine's map wins so that back-translation round-trips through translate()
+        for dots, luganda in self.engine.braille_map.items():
+            char_map[luganda] = dots_to_braille_char(dots)
+
+        cursor.execute('SELECT luganda_word, braille_pattern FROM common_words')
+        self.word_index = {row[0].lower(): row[1] for row in cursor.fetchall()}
+
+        self.char_map = char_map
+        # Multi-letter units (digraphs) are matched by a regex, longest first,
+        # which is the same as greedy longest match from the left; single
+        # letters are then mapped with str.translate
+        digraphs = sorted((unit for unit in char_map if len(unit) > 1), key=len, reverse=True)
+        self._digraph_re = re.compile('|'.join(map(re.escape, digraphs))) if digraphs else None
+        self._letter_table = str.maketrans(
+            {unit: cell for unit, cell in char_map.items() if len(unit) == 1}
+        )
+        self._word_cache = dict(self.word_index)
+
+    def translate_word(self, word: str) -> str:
+        """Translate one Luganda word (no whitespace) to Unicode Braille"""
+        cached = self._word_cache.get(word)
+        if cached is not None:
+            return cached
+
+        lowered = word.lower()
+        braille = self.word_index.get(lowered)
+        if braille is None:
+            braille = self._translate_units(lowered)
+
+        if len(self._word_cache) >= WORD_CACHE_LIMIT:
+            self._word_cache = dict(self.word_index)
+        self._word_cache[word] = braille
+        return braille
+
+    def _translate_units(self, word: str) -> str:
+        """Greedy longest match over letters and digraphs
+
+        Characters without Braille (punctuation, digits) are kept as they are.
+        """
+        if self._digraph_re is not None:
+            word = self._digraph_re.sub(lambda match: self.char_map[match.group()], word)
+        return word.translate(self._letter_table)
+
+    def translate(self, text: str) -> str:
+        """Translate Luganda text, keeping line breaks and word spacing"""
+        translate_word = self.translate_word
+        return '\n'.join(
+            ' '.join([translate_word(word) if word else '' for word in line.split(' ')])
+            for line in text.split('\n')
+        )
+
+    def translate_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Translate an iterable of lines, e.g. an open file, one line at a time"""
+        for line in lines:
+            yield self.translate(line.rstrip('\n'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Translate Luganda text to Unicode Braille')
+    parser.add_argument('input', nargs='?', help='Luganda text file (default: stdin)')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    translator = LugandaToBraille()
+    source = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    target = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for braille_line in translator.translate_lines(source):
+            target.write(braille_line + '\n')
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            target.close()
+        translator.engine.close()
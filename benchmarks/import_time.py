@@ -0,0 +1,85 @@
+"""Measure import time and cold-start latency of the headless entry points.
+
+Every measurement runs in a fresh interpreter so nothing is already cached
+in sys.modules. Run from the repository root:
+
+    python benchmarks/import_time.py [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = ['translation_engine', 'braille_core', 'cli_interface', 'audio_system']
+
+# Modules that must never be pulled in by the headless core
+HEAVY_MODULES = ['pygame', 'numpy', 'tkinter', 'gtts', 'pynput', 'pydub']
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of module in microseconds (python -X importtime)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in reversed(result.stderr.splitlines()):
+        # Format: "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def heavy_imports(module: str) -> list:
+    """Heavy third-party modules that get imported along with module"""
+    check = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', check], cwd=ROOT, capture_output=True, text=True
+    )
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+def cli_wall_time_ms(runs: int) -> list:
+    """Wall time of a one-shot CLI translation, interpreter start included"""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, 'cli_interface.py', 'translate', '⠁⠃⠁⠝⠞⠥'],
+            cwd=ROOT, env=env, capture_output=True, check=True
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='Repetitions per measurement')
+    args = parser.parse_args()
+
+    print(f"{'module':<22}{'median import':>16}{'  heavy imports'}")
+    for module in MODULES:
+        try:
+            samples = [import_time_us(module) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<22}{'failed':>16}  {e.stderr.strip().splitlines()[-1]}")
+            continue
+        heavy = ', '.join(heavy_imports(module)) or '-'
+        print(f"{module:<22}{statistics.median(samples) / 1000:>13.1f} ms  {heavy}")
+
+    timings = cli_wall_time_ms(args.runs)
+    print(f"\ncli_interface translate: median {statistics.median(timings):.1f} ms, "
+          f"max {max(timings):.1f} ms over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
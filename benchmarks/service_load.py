@@ -0,0 +1,101 @@
+"""Load generator for translation_service.py.
+
+Opens a number of keep-alive connections and sends requests back to back
+for a fixed duration, then reports requests per second and latency
+percentiles. Start the service first, then for example:
+
+    python benchmarks/service_load.py --connections 32 --duration 10
+    python benchmarks/service_load.py --endpoint batch --batch-size 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+SAMPLE_LINES = [
+    '⠁⠃⠁⠝⠞⠥ ⠁⠃⠁⠃⠊ ⠍⠥⠅⠺⠁⠝⠕',
+    '⠕⠇⠊ ⠕⠞⠽⠁ ⠝⠽⠕⠝⠽⠊',
+    '⠃⠁⠙⠙⠁ ⠁⠃⠁⠝⠞⠥',
+]
+
+
+def build_request(args) -> bytes:
+    if args.endpoint == 'translate':
+        path, payload = '/translate', {'text': SAMPLE_LINES[0]}
+    elif args.endpoint == 'batch':
+        path = '/translate/batch'
+        payload = {'texts': [SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(args.batch_size)]}
+    else:
+        path, payload = '/analyze', {'words': SAMPLE_LINES[0].split(' ')}
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    return (
+        f"POST {path} HTTP/1.1\r\nHost: {args.host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode('latin-1') + body
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(args, request: bytes, deadline: float, latencies: List[float], errors: List[int]):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+async def main(args):
+    request = build_request(args)
+    latencies: List[float] = []
+    errors: List[int] = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        client(args, request, deadline, latencies, errors) for _ in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        print("No requests completed")
+        return
+    latencies.sort()
+    print(f"{args.endpoint}: {len(latencies)} requests in {elapsed:.1f}s over "
+          f"{args.connections} connections, {len(errors)} errors")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} req/s")
+    print("latency ms: " + '  '.join(
+        f"p{p}={percentile(latencies, p) * 1000:.2f}" for p in (50, 90, 99, 99.9)
+    ) + f"  max={latencies[-1] * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load generator for the translation service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--endpoint', choices=['translate', 'batch', 'analyze'], default='translate')
+    parser.add_argument('--batch-size', type=int, default=100, help='Texts per batch request')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,275 @@
+"""Concurrent virtual-typist load generator for the translation and audio path.
+
+Each virtual typist is a thread that types words from a Luganda corpus as
+chords at a configurable words-per-minute rate (5 characters per word, with
+jittered gaps between chords) and does the work main_app does per chord:
+
+    translate   TranslationEngine.translate_cell(cell)
+    complete    TranslationEngine.complete_word(cells typed so far)
+    audio       AudioSystem.speak of the letter, and of the whole word
+                when it ends, into a NullSink: the recorded assets are
+                loaded and handed to the sink, which only counts them, so
+                no sound device is opened or waited on
+
+Audio requests go through one queue served by --audio-workers threads, the
+way the app funnels speech through one mixer. The load is stepped through
+increasing typist counts. Each step reports offered and achieved chord
+rates, per-stage latency percentiles and the audio queue depth, and the
+first step that misses a budget or falls behind is named together with the
+stage whose p99 latency is largest there.
+
+Run from the repository root:
+
+    python benchmarks/typist_load.py --typists 1,2,4,8,16,32 --wpm 30 --duration 10
+"""
+import argparse
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from braille_cell import EMPTY, Cell
+
+# Built-in corpus, used with the lexicon's words when no --corpus is given
+SAMPLE_TEXT = """
+abantu bangi baagala okusoma ebitabo mu ssomero
+omusomesa asomesa abaana okuwandiika n'okusoma
+mukwano gwange ayagala nnyo okuyimba n'okuzannya
+twagala okuyiga olulimi oluganda buli lunaku
+"""
+CHARS_PER_WORD = 5
+STAGES = ('translate', 'complete', 'audio_wait', 'audio_render')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def load_corpus(path: Optional[str], engine) -> List[str]:
+    """Lowercase Luganda words from path, or from the lexicon and SAMPLE_TEXT"""
+    if path:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        lexicon = [row[0] for row in engine.processor.conn.execute('SELECT luganda_word FROM common_words')]
+        text = SAMPLE_TEXT + ' '.join(lexicon)
+    return re.findall(r"[a-z']+", text.lower())
+
+
+class Step:
+    """Measurements of one load level"""
+    def __init__(self, typists: int):
+        self.typists = typists
+        self.latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES + ('feedback', 'speech')}
+        self.queue_samples: List[int] = []
+        self.elapsed = 0.0
+        self.backlog = 0
+
+    def p(self, stage: str, pct: float) -> float:
+        values = sorted(self.latencies[stage])
+        return percentile(values, pct) * 1000 if values else 0.0
+
+
+class TypistLoad:
+    def __init__(self, engine, audio, words: List[List[Cell]], wpm: float,
+                 audio_workers: int, seed: int):
+        self.engine = engine
+        self.audio = audio
+        self.words = words  # chords (cells) of each corpus word
+        self.chord_interval = 60.0 / (wpm * CHARS_PER_WORD)
+        self.audio_workers = audio_workers
+        self.seed = seed
+
+    def _typist(self, index: int, step: Step, audio_queue: queue.Queue, deadline: float):
+        rng = random.Random(self.seed * 1000 + index)
+        engine, latencies = self.engine, step.latencies
+        next_time = time.perf_counter() + rng.uniform(0, self.chord_interval)
+        while True:
+            word_chords = rng.choice(self.words)
+            cells = []
+            for cell in word_chords + [EMPTY]:
+                next_time += max(0.2, rng.gauss(1.0, 0.3)) * self.chord_interval
+                if next_time >= deadline:
+                    return
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                start = time.perf_counter()
+                if cell:
+                    letter, _ = engine.translate_cell(cell)
+                    translated = time.perf_counter()
+                    cells.append(cell.char)
+                    engine.complete_word(''.join(cells))
+                    completed = time.perf_counter()
+                    latencies['translate'].append(translated - start)
+                    latencies['complete'].append(completed - translated)
+                    text = letter
+                else:
+                    completed = start
+                    text = engine.translate(''.join(cells))[0]
+                # Feedback latency counts from when the chord was due, so a
+                # typist falling behind shows up as latency
+                latencies['feedback'].append(completed - next_time)
+                audio_queue.put((next_time, time.perf_counter(), text))
+
+    def _audio_worker(self, step: Step, audio_queue: queue.Queue):
+        latencies = step.latencies
+        while True:
+            item = audio_queue.get()
+            if item is None:
+                return
+            due, queued, text = item
+            start = time.perf_counter()
+            self.audio.speak(text, 'lg', allow_tts=False)
+            done = time.perf_counter()
+            latencies['audio_wait'].append(start - queued)
+            latencies['audio_render'].append(done - start)
+            latencies['speech'].append(done - due)
+
+    def run_step(self, typists: int, duration: float, drain_timeout: float) -> Step:
+        step = Step(typists)
+        audio_queue: queue.Queue = queue.Queue()
+        workers = [threading.Thread(target=self._audio_worker, args=(step, audio_queue), daemon=True)
+                   for _ in range(self.audio_workers)]
+        for worker in workers:
+            worker.start()
+
+        start = time.perf_counter()
+        deadline = start + duration
+        typist_threads = [
+            threading.Thread(target=self._typist, args=(i, step, audio_queue, deadline), daemon=True)
+            for i in range(typists)
+        ]
+        for thread in typist_threads:
+            thread.start()
+        while time.perf_counter() < deadline:
+            step.queue_samples.append(audio_queue.qsize())
+            time.sleep(0.05)
+        for thread in typist_threads:
+            thread.join()
+        step.elapsed = time.perf_counter() - start
+
+        # Let the audio queue drain, up to a limit, then stop the workers
+        drain_deadline = time.perf_counter() + drain_timeout
+        while audio_queue.qsize() and time.perf_counter() < drain_deadline:
+            time.sleep(0.05)
+        step.backlog = audio_queue.qsize()
+        while True:
+            try:
+                audio_queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in workers:
+            audio_queue.put(None)
+        for worker in workers:
+            worker.join()
+        return step
+
+
+def main(args):
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    os.chdir(ROOT)  # audio assets are found relative to the repository
+    from audio_sinks import NullSink
+    from audio_system import AudioSystem
+    from back_translator import LugandaToBraille
+    from translation_engine import TranslationEngine
+
+    engine = TranslationEngine(args.db, read_only=True)
+    sink = NullSink()
+    audio = AudioSystem(sink=sink)
+    if args.rate != 1.0:
+        audio.set_speech_rate(args.rate)
+    if not audio.ensure_mixer():
+        raise SystemExit("Could not open the (dummy) audio mixer")
+
+    back_translator = LugandaToBraille(engine)
+    words = []
+    for word in load_corpus(args.corpus, engine):
+        cells = back_translator.translate_word(word)
+        chords = [Cell.from_char(cell) for cell in cells if 0x2800 <= ord(cell) <= 0x28FF]
+        if chords:
+            words.append(chords)
+    if not words:
+        raise SystemExit("The corpus has no Luganda words")
+
+    # Build the lexicon caches and decode the letters before measuring
+    engine.complete_word('')
+    for letter in 'abcdefghijklmnoprstuvwyz':
+        audio.speak(letter, 'lg', allow_tts=False)
+
+    load = TypistLoad(engine, audio, words, args.wpm, args.audio_workers, args.seed)
+    offered_per_typist = 1 / load.chord_interval
+    print(f"{len(words):,} corpus words, {args.wpm:g} wpm per typist "
+          f"({offered_per_typist:.1f} chords/s), {args.duration:g}s per step, "
+          f"{args.audio_workers} audio worker(s), null audio sink")
+    print(f"{'typists':>7} {'offered/s':>9} {'done/s':>8} {'feedback p50/p99 ms':>20} "
+          f"{'translate p99':>13} {'complete p99':>12} {'audio wait p99':>14} {'render p99':>10} "
+          f"{'speech p99 ms':>13} {'queue avg/max':>13} {'backlog':>7}")
+
+    saturated = None
+    for typists in args.typists:
+        step = load.run_step(typists, args.duration, args.drain_timeout)
+        # Every chord that came due in the step is handled, late or not, so
+        # typists falling behind show up as the step overrunning its duration
+        chords = len(step.latencies['feedback'])
+        offered = chords / args.duration
+        achieved = chords / step.elapsed
+        samples = step.queue_samples or [0]
+        print(f"{typists:>7} {offered:>9.1f} {achieved:>8.1f} "
+              f"{step.p('feedback', 50):>9.2f}/{step.p('feedback', 99):<10.2f} "
+              f"{step.p('translate', 99):>13.3f} {step.p('complete', 99):>12.3f} "
+              f"{step.p('audio_wait', 99):>14.2f} {step.p('audio_render', 99):>10.2f} "
+              f"{step.p('speech', 99):>13.2f} "
+              f"{sum(samples) / len(samples):>6.1f}/{max(samples):<6} {step.backlog:>7}")
+
+        reasons = []
+        if achieved < 0.95 * offered:
+            reasons.append("typists fell behind")
+        if step.p('feedback', 99) > args.budget_ms:
+            reasons.append(f"feedback p99 over {args.budget_ms:g} ms")
+        if step.p('speech', 99) > args.speech_budget_ms:
+            reasons.append(f"speech p99 over {args.speech_budget_ms:g} ms")
+        if step.backlog:
+            reasons.append("audio queue did not drain")
+        if reasons and saturated is None:
+            bottleneck = max(STAGES, key=lambda stage: step.p(stage, 99))
+            saturated = (typists, reasons, bottleneck)
+            if not args.keep_going:
+                break
+
+    engine.close()
+    print(f"\nNull sink: {sink.plays:,} sounds, {sink.seconds:,.1f} s of audio")
+    if saturated:
+        typists, reasons, bottleneck = saturated
+        print(f"\nSaturated at {typists} typists ({'; '.join(reasons)}); "
+              f"largest p99 stage: {bottleneck}")
+    else:
+        print("\nNo saturation within the tested range")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Simulate concurrent typists against the translation pipeline')
+    parser.add_argument('--typists', type=lambda s: [int(n) for n in s.split(',')],
+                        default=[1, 2, 4, 8, 16, 32], help='Comma-separated typist counts to step through')
+    parser.add_argument('--wpm', type=float, default=30.0, help='Words per minute per typist')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per step')
+    parser.add_argument('--corpus', help='Luganda text to type (default: lexicon and built-in sample)')
+    parser.add_argument('--db', default='braille_luganda.db', help='Lexicon database')
+    parser.add_argument('--audio-workers', type=int, default=1, help='Threads serving the audio queue')
+    parser.add_argument('--rate', type=float, default=1.0, help='Speech rate (time-stretches the assets)')
+    parser.add_argument('--budget-ms', type=float, default=50.0, help='Per-chord feedback budget (p99)')
+    parser.add_argument('--speech-budget-ms', type=float, default=500.0, help='Chord-to-speech budget (p99)')
+    parser.add_argument('--drain-timeout', type=float, default=5.0, help='Seconds to let audio catch up per step')
+    parser.add_argument('--keep-going', action='store_true', help='Run every step even after saturation')
+    parser.add_argument('--seed', type=int, default=1)
+    main(parser.parse_args())
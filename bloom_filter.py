@@ -0,0 +1,103 @@
+"""Bloom filter used as a negative cache in front of lexicon lookups.
+
+A miss in the filter means the key is definitely not in the lexicon, so the
+database (or compiled lexicon) lookup can be skipped. Hits may be false
+positives at a configurable rate, and those still go to the lookup.
+
+By default the filter uses Python's built-in string hash, which is fast
+but differs between processes. Filters that are saved (the compiled
+lexicon stores one) use stable_hash instead and are reloaded with
+from_bits.
+"""
+import math
+from hashlib import blake2b
+from typing import Callable, Dict, Iterable, Optional
+
+
+def stable_hash(key: str) -> int:
+    """64-bit hash of key that is the same in every process"""
+    return int.from_bytes(blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def capacity_with_headroom(count: int) -> int:
+    """Capacity for a lexicon of count words, with room for words added later"""
+    return count + count // 4 + 1024
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01,
+                 max_bytes: Optional[int] = None, hash_function: Callable[[str], int] = hash):
+        """Size for capacity keys at false_positive_rate, capped at max_bytes if given"""
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.hash_function = hash_function
+
+        # Optimal sizing: m = -n ln p / (ln 2)^2 bits, k = m/n ln 2 hashes
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        if max_bytes is not None:
+            self.num_bits = max(8, min(self.num_bits, max_bytes * 8))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_bits(cls, bits: bytearray, num_bits: int, num_hashes: int, capacity: int, count: int,
+                  hash_function: Callable[[str], int] = stable_hash) -> 'BloomFilter':
+        """Filter over saved bits, as written by a filter with the same parameters"""
+        if len(bits) != (num_bits + 7) // 8 or num_hashes < 1 or capacity < 1:
+            raise ValueError("Bloom filter parameters do not match its bits")
+        word_filter = cls.__new__(cls)
+        word_filter.capacity = capacity
+        # The rate the sizing in __init__ was solved for
+        word_filter.false_positive_rate = math.exp(-num_bits / capacity * math.log(2) ** 2)
+        word_filter.hash_function = hash_function
+        word_filter.num_bits = num_bits
+        word_filter.num_hashes = num_hashes
+        word_filter.bits = bits
+        word_filter.count = count
+        return word_filter
+
+    def _positions(self, key: str):
+        # Double hashing on the two halves of the 64-bit string hash
+        h = self.hash_function(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        # Same positions as _positions, computed lazily: most misses stop
+        # at the first or second probe
+        h = self.hash_function(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        m, bits = self.num_bits, self.bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def estimated_false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'entries': self.count,
+            'capacity': self.capacity,
+            'size_bytes': len(self.bits),
+            'hashes': self.num_hashes,
+            'target_false_positive_rate': self.false_positive_rate,
+            'estimated_false_positive_rate': self.estimated_false_positive_rate(),
+        }
@@ -0,0 +1,79 @@
+"""A 6-dot Braille cell as a 6-bit dot mask.
+
+Chords travel from the input handlers through the engine, display and
+audio as Cell values: bit 0 is dot 1 ... bit 5 is dot 6, the same mask as
+cell bytes (see translation_engine), Unicode Braille (U+2800 + mask) and
+the translation table. Cell is an int, so masks are built and tested with
+bit operations, and all 64 cells exist once in CELLS; handing a chord on
+allocates nothing, however long a session runs.
+
+    mask = 0
+    mask |= DOT_BITS[1]          # dot 1 pressed
+    mask |= DOT_BITS[2]
+    chord = CELLS[mask]          # Cell(⠃ 1-2)
+    chord.dots, chord.char       # (1, 2), '⠃'
+"""
+from typing import Iterable, Tuple
+
+BRAILLE_BASE = 0x2800
+MASK_BITS = 0x3F
+# Bit of each dot; index 0 is unused so DOT_BITS[dot] reads naturally
+DOT_BITS = (0, 1 << 0, 1 << 1, 1 << 2, 1 << 3, 1 << 4, 1 << 5)
+
+_DOTS = tuple(tuple(dot for dot in range(1, 7) if mask & DOT_BITS[dot]) for mask in range(64))
+
+
+class Cell(int):
+    """A 6-dot Braille cell; use CELLS[mask] or the from_* constructors"""
+    __slots__ = ()
+
+    def __new__(cls, mask: int = 0):
+        return CELLS[mask & MASK_BITS]
+
+    @classmethod
+    def from_dots(cls, dots: Iterable[int]) -> 'Cell':
+        """Cell with the given dot numbers raised; others than 1-6 are ignored"""
+        mask = 0
+        for dot in dots:
+            if 1 <= dot <= 6:
+                mask |= DOT_BITS[dot]
+        return CELLS[mask]
+
+    @classmethod
+    def from_char(cls, char: str) -> 'Cell':
+        """Cell of a Unicode Braille character (dots 7 and 8 dropped)"""
+        code = ord(char) - BRAILLE_BASE
+        if not 0 <= code < 256:
+            raise ValueError(f"{char!r} is not a Braille cell")
+        return CELLS[code & MASK_BITS]
+
+    @property
+    def dots(self) -> Tuple[int, ...]:
+        """Raised dot numbers, ascending"""
+        return _DOTS[self]
+
+    @property
+    def char(self) -> str:
+        """The Unicode Braille character"""
+        return _CHARS[self]
+
+    @property
+    def count(self) -> int:
+        """Number of raised dots"""
+        return len(_DOTS[self])
+
+    def __repr__(self) -> str:
+        return f"Cell({_CHARS[self]} {'-'.join(map(str, _DOTS[self])) or '0'})"
+
+
+CELLS: Tuple[Cell, ...] = tuple(int.__new__(Cell, mask) for mask in range(64))
+_CHARS = tuple(chr(BRAILLE_BASE + mask) for mask in range(64))
+EMPTY = CELLS[0]
+FULL = CELLS[MASK_BITS]
+
+
+def as_cell(value) -> Cell:
+    """Cell for a Cell, a mask, or a sequence of dot numbers (the older list form)"""
+    if isinstance(value, int):
+        return CELLS[value & MASK_BITS]
+    return Cell.from_dots(value or ())
@@ -0,0 +1,140 @@
+"""Headless translation core used by the CLI and batch jobs.
+
+Only the translation engine and the standard library are imported here.
+Audio support is loaded on first use, so translating text works on hosts
+without a display or a sound card.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from completion_trie import Completion
+from exporters import TranslationRecord, export_records, iter_records
+from suggestion_index import Suggestion
+from translation_engine import TranslationEngine, WordAnalysis
+
+
+class BrailleTranslator:
+    def __init__(self, db_path: str = 'braille_luganda.db', memory_path: Optional[str] = None):
+        # Translations are cached in memory_path across runs when it is given
+        # (see translation_memory.py; memory_path_for puts it beside the lexicon)
+        self.engine = TranslationEngine(db_path, memory_path=memory_path)
+        self.db_path = db_path
+        self._settings = None
+        self._audio = None
+        self._back_translator = None
+
+        # Results of the last process_input call, one entry per line
+        self.records: List[TranslationRecord] = []
+        self.braille_lines: List[str] = []
+        self.luganda_lines: List[str] = []
+        self.phonetic_lines: List[str] = []
+
+    @property
+    def settings(self):
+        """UserSettings, read from the database on first use"""
+        if self._settings is None:
+            from settings import UserSettings
+            self._settings = UserSettings(self.db_path)
+        return self._settings
+
+    @property
+    def audio(self):
+        """AudioSystem, created the first time audio is needed"""
+        if self._audio is None:
+            from audio_system import AudioSystem
+            self._audio = AudioSystem(self.settings)
+        return self._audio
+
+    @property
+    def back_translator(self):
+        """LugandaToBraille sharing this core's engine, built on first use"""
+        if self._back_translator is None:
+            from back_translator import LugandaToBraille
+            self._back_translator = LugandaToBraille(self.engine)
+        return self._back_translator
+
+    def translate_lines(self, lines: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+        """Yield (braille, luganda, phonetic) for each non-empty line"""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            luganda, phonetic = self.engine.translate(line)
+            yield line, luganda, phonetic
+
+    def process_input(self, braille_text: str) -> Tuple[List[str], List[str]]:
+        """Translate multi-line Braille text and keep the result for later commands"""
+        self.records = list(iter_records(self.engine, braille_text.splitlines(keepends=True)))
+        self.braille_lines = [record.braille for record in self.records]
+        self.luganda_lines = [record.luganda for record in self.records]
+        self.phonetic_lines = [record.phonetic for record in self.records]
+        return self.luganda_lines, self.phonetic_lines
+
+    def translate_file(self, input_path: str, output_path: str, phonetic: bool = False) -> int:
+        """Translate a .brf or UTF-8 Unicode Braille file without decoding it to str"""
+        if input_path.lower().endswith('.brf'):
+            from brf import translate_brf_file
+            return translate_brf_file(self.engine, input_path, output_path, phonetic)
+        from unicode_braille import translate_unicode_file
+        return translate_unicode_file(self.engine, input_path, output_path, phonetic)
+
+    def speak_translation(self, line_index: int = 0) -> bool:
+        """Speak one line of the last translation"""
+        if not 0 <= line_index < len(self.luganda_lines):
+            return False
+        return self.audio.speak(self.luganda_lines[line_index], 'lg')
+
+    def complete_word(self, braille_prefix: str, limit: int = 5) -> List[Completion]:
+        """Lexicon words starting with braille_prefix, most frequent first"""
+        return self.engine.complete_word(braille_prefix, limit)
+
+    def suggest_corrections(self, braille_text: str, limit: int = 5) -> Dict[str, List[Suggestion]]:
+        """Closest lexicon words for each word of braille_text that is not in the lexicon"""
+        return self.engine.suggest_corrections(braille_text, limit)
+
+    def speak_suggestions(self, braille_word: str, limit: int = 3) -> List[Suggestion]:
+        """Speak the closest lexicon words to braille_word; returns them"""
+        suggestions = self.engine.processor.suggest_words(braille_word, limit)
+        if suggestions:
+            self.audio.speak(' '.join(s.luganda_word for s in suggestions), 'lg')
+        return suggestions
+
+    def export_audio(self, input_path: str, output_path: str, workers: Optional[int] = None) -> dict:
+        """Render a UTF-8 Braille document to one WAV/OGG file (see audio_export.py)"""
+        from audio_export import export_audio
+        return export_audio(self, input_path, output_path, workers)
+
+    def get_word_analysis(self, braille_word: str) -> dict:
+        """Detailed information about a single Braille word"""
+        return self.engine.get_word_details(braille_word)
+
+    def analyze_text(self, braille_text: str) -> List[WordAnalysis]:
+        """Analysis of every word in a Braille document, in order"""
+        return self.engine.analyze_words(braille_text.split())
+
+    def export_translation(self, filename: str, format: Optional[str] = None) -> bool:
+        """Write the last translation to filename (jsonl, json, csv or text; .gz compresses)"""
+        if not self.records:
+            return False
+        try:
+            export_records(self.records, filename, format)
+            return True
+        except OSError as e:
+            print(f"Export error: {e}")
+            return False
+
+    def export_file(self, input_path: str, output_path: str, format: Optional[str] = None) -> int:
+        """Translate a UTF-8 Braille file into an export, streaming; returns the record count"""
+        with open(input_path, encoding='utf-8-sig') as f:
+            return export_records(iter_records(self.engine, f), output_path, format)
+
+    def close(self):
+        self.engine.close()
+        if self._audio is not None:
+            self._audio.close()
+
+
+if __name__ == "__main__":
+    translator = BrailleTranslator()
+    luganda, phonetic = translator.process_input("⠁⠃⠁⠝⠞⠥ ⠁⠃⠁⠃⠑\n⠍⠥⠅⠺⠁⠝⠕")
+    print("Luganda:", luganda)
+    print("Phonetic:", phonetic)
+    translator.close()
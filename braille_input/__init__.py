@@ -1,5 +1,31 @@
-from .keyboard import KeyboardInput
-from .gui import GUIInput
-from .physical import PhysicalDeviceInput
+from importlib import import_module
+from .base import BrailleInput
 
-__all__ = ['KeyboardInput', 'GUIBrailleInput', 'PhysicalDeviceInput']
\ No newline at end of file
+# Input backends pull in pynput or tkinter, so they are only imported when
+# one is actually requested. 'gui' runs the Tk keyboard in a child process.
+INPUT_METHODS = {
+    'keyboard': ('.keyboard', 'KeyboardInput'),
+    'gui': ('.gui_process', 'GUIProcessInput'),
+    'physical': ('.physical', 'PhysicalDeviceInput'),
+    'replay': ('.replay', 'ReplayInput'),
+}
+# GUIInput runs the Tk main loop and needs the main thread, which the app's
+# window already owns, so it is only used inside the 'gui' child process
+_OTHER_CLASSES = (('.gui', 'GUIInput'),)
+
+
+def create_input(method: str, **options) -> BrailleInput:
+    """Instantiate the input handler registered under method"""
+    module_name, class_name = INPUT_METHODS[method]
+    return getattr(import_module(module_name, __name__), class_name)(**options)
+
+
+def __getattr__(name):
+    for module_name, class_name in (*INPUT_METHODS.values(), *_OTHER_CLASSES):
+        if class_name == name:
+            return getattr(import_module(module_name, __name__), class_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['BrailleInput', 'KeyboardInput', 'GUIProcessInput', 'GUIInput', 'PhysicalDeviceInput',
+           'ReplayInput', 'create_input']
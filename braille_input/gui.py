@@ -1,3 +1,4 @@
+from braille_cell import CELLS, DOT_BITS, Cell
 from .base import BrailleInput
 import tkinter as tk
 from typing import List, Set, Optional, Callable
@@ -7,7 +8,7 @@ import threading
 class GUIInput(BrailleInput):
     def __init__(self, master=None):
         super().__init__()
-        self.current_dots = set()
+        self.mask = 0  # Dots selected, as a cell mask
         self.dot_buttons = []
         self.callback = None
         self._showing = False
@@ -36,9 +37,8 @@ class GUIInput(BrailleInput):
 
     def _create_window(self):
         """Create the actual visible window with guaranteed visibility"""
-        self.root = tk.Tk()
-        if not self.root:
-            return  # Prevent creation if root doesn't exist
+        if self.root is None:
+            self.root = tk.Tk()
         self.root.withdraw()  # Hide until fully initialized
         self._setup_gui_components()
         self._finalize_window()
@@ -132,11 +132,11 @@ class GUIInput(BrailleInput):
 
     def _handle_dot_press(self, dot: int) -> None:
         """Handle physical or virtual dot button presses."""
-        if dot in self.current_dots:
-            self.current_dots.remove(dot)
+        if self.mask & DOT_BITS[dot]:
+            self.mask &= ~DOT_BITS[dot]
             self.dot_buttons[dot-1].config(relief=tk.RAISED, bg='white')
         else:
-            self.current_dots.add(dot)
+            self.mask |= DOT_BITS[dot]
             self.dot_buttons[dot-1].config(relief=tk.SUNKEN, bg='lightgray')
         self._update_display()
 
@@ -144,8 +144,8 @@ class GUIInput(BrailleInput):
         """Handle keyboard key presses (f, d, s, j, k, l → dots 1-6)."""
         if event.keysym.lower() in self.key_map:
             dot = self.key_map[event.keysym.lower()]
-            if dot not in self.current_dots:
-                self.current_dots.add(dot)
+            if not self.mask & DOT_BITS[dot]:
+                self.mask |= DOT_BITS[dot]
                 self.dot_buttons[dot-1].config(relief=tk.SUNKEN, bg='lightgray')
                 self._update_display()
         elif event.keysym == 'space':
@@ -155,18 +155,20 @@ class GUIInput(BrailleInput):
         """Handle keyboard key releases."""
         if event.keysym.lower() in self.key_map:
             dot = self.key_map[event.keysym.lower()]
-            if dot in self.current_dots:
-                self.current_dots.remove(dot)
+            if self.mask & DOT_BITS[dot]:
+                self.mask &= ~DOT_BITS[dot]
                 self.dot_buttons[dot-1].config(relief=tk.RAISED, bg='white')
                 self._update_display()
 
     def _submit_dots(self) -> None:
-        """Submit the current Braille character."""
-        if self.callback and self.current_dots:
-            self.callback(sorted(self.current_dots))
+        """Submit the current Braille character (an empty cell ends the word)."""
+        if self.callback and self.mask:
+            self.callback(CELLS[self.mask])
             self._clear_visual_dots()
-            self.current_dots.clear()
+            self.mask = 0
             self._update_display()
+        elif self.callback:
+            self.callback(CELLS[0])
 
     def _clear_visual_dots(self) -> None:
         """Reset all dot buttons to their default state."""
@@ -176,12 +178,12 @@ class GUIInput(BrailleInput):
     def _update_display(self) -> None:
         """Update the status label with currently pressed dots."""
         if self.status_label:
-            dots_text = sorted(self.current_dots) if self.current_dots else "None"
+            dots_text = list(CELLS[self.mask].dots) if self.mask else "None"
             self.status_label.config(text=f"Current Dots: {dots_text}")
 
-    def get_current_input(self) -> List[int]:
-        """Return currently selected dots as a sorted list."""
-        return sorted(self.current_dots.copy())
+    def get_current_input(self) -> Cell:
+        """Return currently selected dots as a cell."""
+        return CELLS[self.mask]
     
     def _on_close(self):
         """Handle window closing properly"""
@@ -213,9 +215,9 @@ class GUIInput(BrailleInput):
                     self.root.destroy()
                 else:
                     self.root.after(0, self.root.destroy)
-            except tk.Tclerror:
+            except tk.TclError:
                 pass
             
         #Cleanup state
-        self.current_dots.clear()
+        self.mask = 0
         self.callback = None
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""The Tk virtual keyboard in a child process.
+
+Tk and the pygame window both want the main thread, and sharing a process
+they also share the GIL. GUIProcessInput therefore runs GUIInput as the
+main thread of its own interpreter and streams chords to the app over the
+child's stdout pipe, one fixed-size record per chord:
+
+    dot mask (1 byte: bit 0 = dot 1 ... bit 5 = dot 6; 0 is an empty cell,
+    i.e. Submit or Space with no dots), send time (int64 monotonic ns)
+
+The app's side reads records on a background thread and calls the
+callback, so neither UI waits for the other to start. The monotonic clock
+is shared between processes, so each record's delay from button press to
+its arrival at the callback is measured; report() gives it in
+microseconds, and the time spent in the callback itself separately.
+
+    python -m braille_input.gui_process   # prints the chords it receives
+"""
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from braille_cell import CELLS
+from .base import BrailleInput
+from .replay import dots_to_mask, percentile
+
+EVENT = struct.Struct('<Bq')
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_keyboard():
+    """Child side: show the keyboard and write chords to stdout until it closes"""
+    # Records go to the original stdout; anything printed goes to stderr
+    out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb', buffering=0)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    from .gui import GUIInput
+
+    def send(dots):
+        try:
+            out.write(EVENT.pack(dots_to_mask(dots), time.monotonic_ns()))
+        except BrokenPipeError:
+            keyboard.stop()  # the app has gone
+
+    keyboard = GUIInput()
+    keyboard.listen(send)  # runs the Tk main loop
+    out.close()
+
+
+class GUIProcessInput(BrailleInput):
+    """Virtual keyboard in a child process; chords arrive on a reader thread"""
+    def __init__(self):
+        self.process: Optional[subprocess.Popen] = None
+        self.latencies: List[int] = []  # ns from button press to the callback
+        self.handler_times: List[int] = []  # ns spent in the callback
+        self._reader: Optional[threading.Thread] = None
+
+    def listen(self, callback: Callable):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'braille_input.gui_process', '--child'],
+            stdout=subprocess.PIPE, cwd=PACKAGE_ROOT, bufsize=0,
+        )
+        self._reader = threading.Thread(target=self._read, args=(callback,), daemon=True)
+        self._reader.start()
+
+    def _read(self, callback: Callable):
+        pipe = self.process.stdout
+        while True:
+            record = pipe.read(EVENT.size)
+            if len(record) < EVENT.size:
+                return  # the keyboard window was closed
+            mask, sent = EVENT.unpack(record)
+            received = time.monotonic_ns()
+            self.latencies.append(received - sent)
+            callback(CELLS[mask & 0x3F])
+            self.handler_times.append(time.monotonic_ns() - received)
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process.stdout.close()
+        self.process = None
+
+    def report(self) -> Dict[str, float]:
+        """Press-to-callback latency percentiles in microseconds, and callback time"""
+        values = sorted(self.latencies)
+        if not values:
+            return {'events': 0}
+        report = {'events': len(values)}
+        for pct in (50, 90, 99):
+            report[f'p{pct}_us'] = percentile(values, pct) / 1000
+        report['max_us'] = values[-1] / 1000
+        handler_times = sorted(self.handler_times)
+        if handler_times:
+            report['handler_p50_us'] = percentile(handler_times, 50) / 1000
+            report['handler_max_us'] = handler_times[-1] / 1000
+        return report
+
+
+if __name__ == "__main__":
+    if '--child' in sys.argv[1:]:
+        run_keyboard()
+    else:
+        keyboard = GUIProcessInput()
+        keyboard.listen(lambda cell: print("Chord:", cell.dots or "(end of word)"))
+        try:
+            keyboard.process.wait()
+        except KeyboardInterrupt:
+            pass
+        keyboard.stop()
+        print("Latency:", keyboard.report())
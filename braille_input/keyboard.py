@@ -1,16 +1,16 @@
 from pynput.keyboard import Listener, Key
 import time
-import pygame
+from braille_cell import CELLS, DOT_BITS, Cell
 from .base import BrailleInput
 
 class KeyboardInput(BrailleInput):
     def __init__(self):
-        self.current_dots = set()  # Preserves multi-key presses
+        self.mask = 0  # Dots held, as a cell mask; preserves multi-key presses
         self.callback = None
         self.last_key_time = time.time()
         self.dot_map = {
-            'f': 1, 'd': 2, 's': 3,
-            'j': 4, 'k': 5, 'l': 6
+            'f': DOT_BITS[1], 'd': DOT_BITS[2], 's': DOT_BITS[3],
+            'j': DOT_BITS[4], 'k': DOT_BITS[5], 'l': DOT_BITS[6]
         }
         self.listener = None
         
@@ -30,9 +30,9 @@ class KeyboardInput(BrailleInput):
         try:
             char = key.char.lower()
             if char in self.dot_map:
-                self.current_dots.add(self.dot_map[char])  # Add to current combination
+                self.mask |= self.dot_map[char]  # Add to current combination
                 self.last_key_time = time.time()
-                print(f"Current dots: {self.current_dots}")  # Debug multi-key input
+                print(f"Current dots: {CELLS[self.mask].dots}")  # Debug multi-key input
 
         except AttributeError:
             if key == Key.space:
@@ -43,17 +43,16 @@ class KeyboardInput(BrailleInput):
         try:
             char = key.char.lower()
             if char in self.dot_map:
-                dot = self.dot_map[char]
-                if dot in self.current_dots:
-                    self.current_dots.remove(dot)
+                self.mask &= ~self.dot_map[char]
         except AttributeError:
             pass
 
     def _submit_dots(self):
         """Preserves full multi-character submissions"""
-        if self.current_dots:
-            self.callback(sorted(self.current_dots))  # Sends complete combination
-            self.current_dots.clear()
+        # Sends the complete combination; Space on its own (the empty
+        # cell) ends the word
+        self.callback(CELLS[self.mask])
+        self.mask = 0
 
     def update(self):
         """Auto-submit check integrated with main loop"""
@@ -64,6 +63,6 @@ class KeyboardInput(BrailleInput):
         if self.listener:
             self.listener.stop()
             
-    def get_current_input(self) -> list:
-        """Returns currently pressed dots as sorted list"""
-        return sorted(self.current_dots.copy())
\ No newline at end of file
+    def get_current_input(self) -> Cell:
+        """Returns currently pressed dots as a cell"""
+        return CELLS[self.mask]
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""Record input sessions and replay them as an input source.
+
+A session log is a small header followed by one record per chord:
+
+    header   b'BRSL', format version (1 byte), wall-clock start (float64)
+    event    dot mask (1 byte: bit 0 = dot 1 ... bit 7 = dot 8; 0 is an
+             empty cell, i.e. Space on its own), then the milliseconds
+             since the previous event as an unsigned LEB128 varint
+
+so a typical event takes 3 bytes. Timestamps come from the monotonic clock.
+Events are recorded from, and replayed as, Cell values (braille_cell.py).
+
+RecordingInput wraps any other input method and logs what it delivers;
+ReplayInput implements BrailleInput and plays a log back at its original
+pace, at a multiple of it, or as fast as possible, measuring how long
+after its recorded time each event is fully handled:
+
+    python -m braille_input.replay session.brsl [--speed 2 | --speed 0] [--budget-ms 50]
+
+replays a session through the headless typing path (translation and word
+completion) and reports latency percentiles against the budget.
+"""
+import struct
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple
+from braille_cell import CELLS, Cell
+from .base import BrailleInput
+
+MAGIC = b'BRSL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBd')
+
+
+class ReplayEvent(NamedTuple):
+    offset: float  # seconds since the first event
+    cell: Cell
+
+
+def dots_to_mask(dots) -> int:
+    """Mask of a Cell (or any int mask) or of a sequence of dot numbers"""
+    if isinstance(dots, int):
+        return dots & 0xFF
+    return sum(1 << (dot - 1) for dot in set(dots) if 1 <= dot <= 8)
+
+
+def mask_to_dots(mask: int) -> List[int]:
+    return [dot for dot in range(1, 9) if mask & (1 << (dot - 1))]
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+class SessionRecorder:
+    """Appends chord events to a session log"""
+    def __init__(self, path: str):
+        self.path = path
+        self.file: BinaryIO = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, time.time()))
+        self.file.flush()
+        self.events = 0
+        self._last_ms: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def record(self, dots):
+        now_ms = time.monotonic_ns() // 1_000_000
+        with self._lock:
+            if self.file.closed:
+                return
+            delta = 0 if self._last_ms is None else now_ms - self._last_ms
+            self._last_ms = now_ms
+            self.file.write(bytes([dots_to_mask(dots)]) + _varint(delta))
+            # Flushed per event so a crashed session is still replayable
+            self.file.flush()
+            self.events += 1
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+
+def read_session(path: str) -> Tuple[float, List[ReplayEvent]]:
+    """Wall-clock start time and the events of a session log"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a session log")
+    magic, version, started = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a session log (format {FORMAT_VERSION})")
+
+    events, offset_ms, i = [], 0, HEADER.size
+    while i < len(data):
+        mask, delta, shift = data[i], 0, 0
+        i += 1
+        while True:
+            if i >= len(data):
+                return started, events  # truncated final event
+            byte = data[i]
+            i += 1
+            delta |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        offset_ms += delta
+        # Dots 7 and 8 are kept in the log but not in the cell
+        events.append(ReplayEvent(offset_ms / 1000, CELLS[mask & 0x3F]))
+    return started, events
+
+
+class RecordingInput(BrailleInput):
+    """Passes another input method's events through while logging them"""
+    def __init__(self, inner: BrailleInput, path: str):
+        self.inner = inner
+        self.recorder = SessionRecorder(path)
+
+    def listen(self, callback):
+        def record_and_forward(dots):
+            self.recorder.record(dots)
+            callback(dots)
+        self.inner.listen(record_and_forward)
+
+    def stop(self):
+        if hasattr(self.inner, 'stop'):
+            self.inner.stop()
+        self.recorder.close()
+
+
+class ReplayInput(BrailleInput):
+    """Feeds a recorded session to the callback from a background thread
+
+    speed is a multiple of the recorded pace; 0 replays as fast as
+    possible. For each event the latency from its scheduled time to the
+    callback returning is kept in latencies, so time spent waiting behind
+    a slow earlier event counts, as it would for a user.
+    """
+    def __init__(self, path: str, speed: float = 1.0):
+        if speed < 0:
+            raise ValueError("speed must be 0 (as fast as possible) or positive")
+        self.path = path
+        self.speed = speed
+        _, self.events = read_session(path)
+        self.latencies: List[float] = []
+        self.done = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def listen(self, callback):
+        self._thread = threading.Thread(target=self._replay, args=(callback,), daemon=True)
+        self._thread.start()
+
+    def _replay(self, callback: Callable):
+        start = time.perf_counter()
+        try:
+            for event in self.events:
+                if self.speed:
+                    scheduled = start + event.offset / self.speed
+                    # Event.wait returns early when stop() is called
+                    if self._stopped.wait(max(0.0, scheduled - time.perf_counter())):
+                        break
+                else:
+                    if self._stopped.is_set():
+                        break
+                    scheduled = time.perf_counter()
+                callback(event.cell)
+                self.latencies.append(time.perf_counter() - scheduled)
+        finally:
+            self.done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the session has been replayed; False on timeout"""
+        return self.done.wait(timeout)
+
+    def stop(self):
+        self._stopped.set()
+
+    def report(self, budget: Optional[float] = None) -> Dict[str, float]:
+        """Latency percentiles in ms, plus the share of events over budget (seconds)"""
+        return latency_report(self.latencies, budget)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def latency_report(latencies: List[float], budget: Optional[float] = None) -> Dict[str, float]:
+    values = sorted(latencies)
+    if not values:
+        return {'events': 0}
+    report = {'events': len(values)}
+    for pct in (50, 90, 99):
+        report[f'p{pct}_ms'] = percentile(values, pct) * 1000
+    report['max_ms'] = values[-1] * 1000
+    if budget is not None:
+        report['over_budget'] = sum(1 for value in values if value > budget)
+        report['over_budget_ratio'] = report['over_budget'] / len(values)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from translation_engine import TranslationEngine
+
+    parser = argparse.ArgumentParser(description='Replay a recorded input session headlessly')
+    parser.add_argument('session', help='Session log written with --record')
+    parser.add_argument('--db', default='braille_luganda.db', help='Lexicon database')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Multiple of the recorded pace; 0 = as fast as possible')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Per-event latency budget')
+    args = parser.parse_args()
+
+    engine = TranslationEngine(args.db, read_only=True)
+    word: List[str] = []
+
+    # The work main_app does per chord, without the display and audio
+    def handle(cell):
+        if not cell:
+            word.clear()
+            return
+        engine.translate_cell(cell)
+        word.append(cell.char)
+        engine.complete_word(''.join(word))
+
+    replay = ReplayInput(args.session, args.speed)
+    replay.listen(handle)
+    try:
+        replay.wait()
+    except KeyboardInterrupt:
+        replay.stop()
+    engine.close()
+
+    budget = args.budget_ms / 1000 if args.budget_ms is not None else None
+    report = replay.report(budget)
+    print(f"Replayed {report['events']:,} events from {args.session} at "
+          f"{'maximum speed' if not args.speed else f'{args.speed:g}x'}")
+    for key, value in report.items():
+        if key != 'events':
+            print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value:,}")
+    if budget is not None and report.get('over_budget'):
+        raise SystemExit(1)
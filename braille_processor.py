@@ -1,10 +1,53 @@
+import json
 import sqlite3
-from typing import List, Optional, Dict
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+from bloom_filter import BloomFilter, capacity_with_headroom
+from db_connection import ConnectionManager
+from suggestion_index import Suggestion, SuggestionIndex
+from compiled_lexicon import default_path, open_compiled_lexicon
+from completion_trie import Completion, PrefixTrie
+from lexicon import bump_lexicon_version, ensure_lexicon_schema, get_lexicon_version, has_frequency
+
+# Seconds between checks for lexicon changes made by other processes
+LEXICON_CHECK_INTERVAL = 1.0
 
 class BrailleProcessor:
-    def __init__(self, db_path: str = 'braille_luganda.db'):
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row  # Enable dictionary-like access
+    def __init__(self, db_path: str = 'braille_luganda.db', read_only: bool = False,
+                 bloom_fp_rate: float = 0.01, bloom_max_bytes: Optional[int] = None):
+        self.db_path = db_path
+        # One connection per thread: input callbacks, timers and service
+        # workers all query the lexicon from their own threads
+        self.connections = ConnectionManager(db_path, read_only=read_only)
+        # Memory-mapped common_words, used for word lookups when it is
+        # present and current (see compiled_lexicon.py)
+        self.lexicon = open_compiled_lexicon(self.conn, default_path(db_path))
+        self.lexicon_version = get_lexicon_version(self.conn)
+        self._last_version_check = time.monotonic()
+
+        # Bloom filter of all lexicon patterns, loaded from the compiled
+        # lexicon or built on first lookup (then sized by bloom_fp_rate and
+        # bloom_max_bytes); a miss means the word is certainly unknown and
+        # no lookup is needed
+        self.bloom_fp_rate = bloom_fp_rate
+        self.bloom_max_bytes = bloom_max_bytes
+        self.word_filter: Optional[BloomFilter] = None
+        self._filter_lock = threading.Lock()
+        self.lookup_stats = {'lookups': 0, 'filtered': 0, 'false_positives': 0}
+        self._stats_lock = threading.Lock()
+
+        # Correction index over all lexicon patterns, built on first use
+        self.suggestion_index: Optional[SuggestionIndex] = None
+        self._suggestion_lock = threading.Lock()
+        # Prefix trie for completing partly typed words, built on first use
+        self.completions: Optional[PrefixTrie] = None
+        self._completion_lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Database connection for the calling thread"""
+        return self.connections.connection()
         
     def get_braille_mapping(self, braille_code: str) -> Optional[Dict]:
         """Get Luganda mapping for a single Braille character"""
@@ -15,18 +58,212 @@ class BrailleProcessor:
         )
         return cursor.fetchone()
     
+    def check_lexicon_version(self) -> int:
+        """Current lexicon version; drops lexicon caches if another connection changed it"""
+        now = time.monotonic()
+        if now - self._last_version_check < LEXICON_CHECK_INTERVAL:
+            return self.lexicon_version
+        self._last_version_check = now
+        version = get_lexicon_version(self.conn)
+        if version != self.lexicon_version:
+            self.lexicon_version = version
+            self._reset_lexicon_caches()
+        return version
+
+    def _reset_lexicon_caches(self):
+        # The old compiled lexicon is not closed: other threads may be in the
+        # middle of a lookup on it. It is unmapped once they drop it.
+        self.lexicon = open_compiled_lexicon(self.conn, default_path(self.db_path))
+        self.word_filter = None
+        self.suggestion_index = None
+        self.completions = None
+
+    def _build_word_filter(self) -> BloomFilter:
+        lexicon = self.lexicon
+        if lexicon is not None:
+            return lexicon.word_filter()
+        patterns = [row[0] for row in self.conn.execute('SELECT braille_pattern FROM common_words')]
+        # Headroom so words added later keep the false-positive rate near target
+        word_filter = BloomFilter(capacity_with_headroom(len(patterns)),
+                                  self.bloom_fp_rate, self.bloom_max_bytes)
+        word_filter.update(patterns)
+        return word_filter
+
+    def _count(self, name: str, n: int = 1):
+        # Lookups come from many threads; += on a dict entry is not atomic
+        with self._stats_lock:
+            self.lookup_stats[name] += n
+
+    def might_contain(self, braille_word: str) -> bool:
+        """False when braille_word is certainly not in common_words"""
+        self.check_lexicon_version()
+        word_filter = self.word_filter
+        if word_filter is None:
+            with self._filter_lock:
+                if self.word_filter is None:
+                    self.word_filter = self._build_word_filter()
+                word_filter = self.word_filter
+
+        found = braille_word in word_filter
+        with self._stats_lock:
+            self.lookup_stats['lookups'] += 1
+            if not found:
+                self.lookup_stats['filtered'] += 1
+        return found
+
+    def suggest_words(self, braille_word: str, limit: int = 5,
+                      max_distance: Optional[int] = None) -> List[Suggestion]:
+        """Lexicon words within a few dots of braille_word, closest first (see suggestion_index.py)"""
+        self.check_lexicon_version()
+        index = self.suggestion_index
+        if index is None:
+            with self._suggestion_lock:
+                if self.suggestion_index is None:
+                    index = SuggestionIndex()
+                    index.update(self.conn.execute('SELECT braille_pattern, luganda_word FROM common_words'))
+                    self.suggestion_index = index
+                index = self.suggestion_index
+        return index.suggest(braille_word, limit, max_distance)
+
+    def completion_trie(self) -> PrefixTrie:
+        """The lexicon's PrefixTrie, built on the first call after a lexicon change"""
+        self.check_lexicon_version()
+        trie = self.completions
+        if trie is None:
+            with self._completion_lock:
+                if self.completions is None:
+                    frequency = 'frequency' if has_frequency(self.conn) else '0'
+                    self.completions = PrefixTrie(self.conn.execute(
+                        f'SELECT braille_pattern, luganda_word, {frequency} FROM common_words'
+                    ))
+                trie = self.completions
+        return trie
+
+    def complete_word(self, braille_prefix: str, limit: int = 5) -> List[Completion]:
+        """Most frequent lexicon words starting with braille_prefix (see completion_trie.py)"""
+        return self.completion_trie().complete(braille_prefix, limit)
+
+    def lookup_word(self, braille_word: str) -> Optional[str]:
+        """Luganda word for a whole Braille pattern in common_words, or None"""
+        if not self.might_contain(braille_word):
+            return None
+
+        lexicon = self.lexicon
+        if lexicon is not None:
+            result = lexicon.get(braille_word)
+        else:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                'SELECT luganda_word FROM common_words WHERE braille_pattern = ?',
+                (braille_word,)
+            )
+            row = cursor.fetchone()
+            result = row['luganda_word'] if row else None
+
+        if result is None:
+            self._count('false_positives')
+        return result
+
+    def get_word_entry(self, braille_word: str) -> Optional[sqlite3.Row]:
+        """Full common_words row for a Braille pattern, or None"""
+        if not self.might_contain(braille_word):
+            return None
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT * FROM common_words WHERE braille_pattern = ?', (braille_word,))
+        row = cursor.fetchone()
+        if row is None:
+            self._count('false_positives')
+        return row
+
+    def known_words(self, braille_words: Iterable[str]) -> Set[str]:
+        """The patterns among braille_words that are in common_words"""
+        candidates = [word for word in set(braille_words) if self.might_contain(word)]
+        if not candidates:
+            return set()
+        lexicon = self.lexicon
+        if lexicon is not None:
+            known = {word for word in candidates if word in lexicon}
+        else:
+            known = {row[0] for row in self.conn.execute(
+                'SELECT braille_pattern FROM common_words '
+                'WHERE braille_pattern IN (SELECT value FROM json_each(?))',
+                (json.dumps(candidates),)
+            )}
+        self._count('false_positives', len(candidates) - len(known))
+        return known
+
+    def get_word_entries(self, braille_words: Iterable[str]) -> Dict[str, sqlite3.Row]:
+        """common_words rows for many patterns in one query, keyed by pattern"""
+        candidates = [word for word in set(braille_words) if self.might_contain(word)]
+        if not candidates:
+            return {}
+        entries = {}
+        for row in self.conn.execute(
+            'SELECT * FROM common_words WHERE braille_pattern IN (SELECT value FROM json_each(?)) ORDER BY id',
+            (json.dumps(candidates),)
+        ):
+            entries.setdefault(row['braille_pattern'], row)
+        self._count('false_positives', len(candidates) - len(entries))
+        return entries
+
+    def get_braille_mappings(self, braille_codes: Iterable[str]) -> Dict[str, sqlite3.Row]:
+        """braille_patterns rows for many characters in one query, keyed by character"""
+        codes = list(set(braille_codes))
+        if not codes:
+            return {}
+        cursor = self.conn.execute(
+            'SELECT * FROM braille_patterns WHERE braille_code IN (SELECT value FROM json_each(?))',
+            (json.dumps(codes),)
+        )
+        return {row['braille_code']: row for row in cursor}
+
+    def add_word(self, braille_pattern: str, luganda_word: str,
+                 english_meaning: Optional[str] = None, category: Optional[str] = None,
+                 frequency: Optional[int] = None):
+        """Add a word to common_words, replacing any entry with the same pattern
+
+        frequency defaults to 0 for new words and is kept for existing ones.
+        """
+        with self.conn as conn:
+            ensure_lexicon_schema(conn)
+            conn.execute(
+                'INSERT INTO common_words (braille_pattern, luganda_word, english_meaning, category, frequency) '
+                'VALUES (:pattern, :word, :meaning, :category, COALESCE(:frequency, 0)) '
+                'ON CONFLICT(braille_pattern) DO UPDATE SET '
+                'luganda_word = excluded.luganda_word, english_meaning = excluded.english_meaning, '
+                'category = excluded.category, frequency = COALESCE(:frequency, frequency)',
+                {'pattern': braille_pattern, 'word': luganda_word, 'meaning': english_meaning,
+                 'category': category, 'frequency': frequency}
+            )
+            self.lexicon_version = bump_lexicon_version(conn)
+
+        # The compiled lexicon is now stale (and is left to readers still
+        # using it); the filter, the suggestion index and the completion
+        # trie only need the new entry
+        self.lexicon = None
+        if self.word_filter is not None:
+            self.word_filter.add(braille_pattern)
+        if self.suggestion_index is not None:
+            self.suggestion_index.add(braille_pattern, luganda_word)
+        if self.completions is not None:
+            self.completions.add(braille_pattern, luganda_word, frequency)
+
+    def filter_report(self) -> Dict:
+        """Bloom filter size and accuracy plus lookup counters"""
+        with self._stats_lock:
+            report = dict(self.lookup_stats)
+        lookups = report['lookups']
+        report['filtered_ratio'] = report['filtered'] / lookups if lookups else 0.0
+        if self.word_filter is not None:
+            report.update(self.word_filter.stats())
+        return report
+
     def translate_braille_word(self, braille_word: str) -> Optional[str]:
         """Translate a Braille word to Luganda"""
         # First try exact match in common words
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT luganda_word FROM common_words WHERE braille_pattern = ?',
-            (braille_word,)
-        )
-        result = cursor.fetchone()
-        
+        result = self.lookup_word(braille_word)
         if result:
-            return result['luganda_word']
+            return result
         
         # If not found, translate character by character
         translated_chars = []
@@ -59,7 +296,9 @@ class BrailleProcessor:
         return translated_lines
     
     def close(self):
-        self.conn.close()
+        if self.lexicon is not None:
+            self.lexicon.close()
+        self.connections.close()
 
 # Example usage
 if __name__ == "__main__":
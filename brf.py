@@ -0,0 +1,205 @@
+"""BRF (North American ASCII Braille) reading and writing.
+
+BRF files are handled as bytes end to end: a 256-entry bytes.translate
+table turns BRF into the engine's cell bytes (see translation_engine), and
+another turns cell bytes back into BRF. Input files are read through a
+memory map in bounded chunks, so archives are never decoded to str or held
+in memory whole.
+
+    python brf.py to-luganda book.brf -o book.txt
+    python brf.py from-luganda lesson.txt -o lesson.brf --cells 40 --lines 25
+"""
+import argparse
+import mmap
+import os
+import re
+from typing import BinaryIO, Iterator, List
+from translation_engine import CELL_BASE, CELL_WHITESPACE, UNKNOWN_CELL, TranslationEngine
+
+# ASCII Braille characters indexed by dot mask (bit 0 = dot 1 ... bit 5 = dot 6)
+BRF_CHARS = b" A1B'K2L@CIF/MSP\"E3H9O6R^DJG>NTQ,*5<-U8V.%[$+X!&;:4\\0Z7(_?W]#Y)="
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _build_tables():
+    to_cells = bytearray([UNKNOWN_CELL] * 256)
+    from_cells = bytearray(b'?' * 256)
+    for mask, char in enumerate(BRF_CHARS):
+        to_cells[char] = CELL_BASE | mask
+        from_cells[CELL_BASE | mask] = char
+        # Lowercase BRF (0x60-0x7F) is the same cell as 0x40-0x5F
+        if 0x40 <= char < 0x60:
+            to_cells[char + 0x20] = CELL_BASE | mask
+    for char in CELL_WHITESPACE:
+        to_cells[char] = char
+        from_cells[char] = char
+    # The blank cell is written as a space
+    from_cells[CELL_BASE] = ord(' ')
+    return bytes(to_cells), bytes(from_cells)
+
+
+BRF_TO_CELLS, CELLS_TO_BRF = _build_tables()
+UNICODE_TO_BRF = {0x2800 + mask: char for mask, char in enumerate(BRF_CHARS)}
+# Anything but 6-dot cells and whitespace; ASCII letters, digits and
+# punctuation are themselves BRF cells, so they cannot pass through
+_NON_BRF = re.compile('[^\u2800-\u283f \t\n\f\r]')
+# A run of spaces and the word after it
+_SPACED_WORD = re.compile(rb'( *)([^ ]*)')
+
+
+def unicode_to_brf(text: str) -> bytes:
+    """Convert Unicode Braille text to BRF; other characters become '?'"""
+    return _NON_BRF.sub('?', text).translate(UNICODE_TO_BRF).encode('ascii')
+
+
+def iter_mmap_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file's contents in chunks of about chunk_size bytes
+
+    The file is memory-mapped; chunks end after a newline (or failing that a
+    space) so no line or word is split unless it is longer than chunk_size,
+    and never inside a UTF-8 sequence.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = start + chunk_size
+                if end >= size:
+                    end = size
+                else:
+                    cut = mm.rfind(b'\n', start, end)
+                    if cut == -1:
+                        cut = mm.rfind(b' ', start, end)
+                    if cut != -1:
+                        end = cut + 1
+                    else:
+                        while end > start + 1 and mm[end] & 0xC0 == 0x80:
+                            end -= 1
+                yield mm[start:end]
+                start = end
+
+
+def read_brf_cells(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the cell bytes of a BRF file chunk by chunk"""
+    for chunk in iter_mmap_chunks(path, chunk_size):
+        yield chunk.translate(BRF_TO_CELLS)
+
+
+def translate_brf_file(engine: TranslationEngine, input_path: str, output_path: str,
+                       phonetic: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Translate a BRF file to UTF-8 Luganda (or IPA); returns bytes read"""
+    total = 0
+    with open(output_path, 'wb') as out:
+        for cells in read_brf_cells(input_path, chunk_size):
+            total += len(cells)
+            out.write(engine.translate_cells(cells, phonetic))
+    return total
+
+
+def wrap_brf_line(line: bytes, cells_per_line: int) -> List[bytes]:
+    """Word-wrap one BRF line; words longer than a line are split
+
+    Leading and repeated spaces are layout (indentation, columns) and are
+    kept; only the spaces where a row is broken are dropped.
+    """
+    rows = []
+    current = b''
+    for gap, word in _SPACED_WORD.findall(line):
+        if current and len(current) + len(gap) + len(word) > cells_per_line:
+            if not word:
+                continue  # trailing spaces past the end of the row
+            rows.append(current)
+            current, gap = b'', b''
+        current += gap + word
+        while len(current) > cells_per_line:
+            rows.append(current[:cells_per_line])
+            current = current[cells_per_line:]
+    rows.append(current)
+    return rows
+
+
+class BRFWriter:
+    """Paginated BRF output for embossers
+
+    Lines are wrapped to cells_per_line, end with CR LF, and pages of
+    lines_per_page lines are separated by form feeds.
+    """
+    def __init__(self, fileobj: BinaryIO, cells_per_line: int = 40, lines_per_page: int = 25):
+        if cells_per_line < 1 or lines_per_page < 1:
+            raise ValueError("cells_per_line and lines_per_page must be positive")
+        self.file = fileobj
+        self.cells_per_line = cells_per_line
+        self.lines_per_page = lines_per_page
+        self.line_on_page = 0
+        self.pages = 0
+
+    def write(self, brf: bytes):
+        """Write BRF text; newlines end lines and form feeds force a page break"""
+        for i, page in enumerate(brf.split(b'\f')):
+            if i:
+                self.new_page()
+            for line in page.splitlines():
+                for row in wrap_brf_line(line, self.cells_per_line):
+                    self._write_row(row)
+
+    def write_cells(self, cells: bytes):
+        self.write(cells.translate(CELLS_TO_BRF))
+
+    def write_unicode(self, text: str):
+        self.write(unicode_to_brf(text))
+
+    def new_page(self):
+        if self.line_on_page:
+            self.file.write(b'\f')
+            self.line_on_page = 0
+
+    def _write_row(self, row: bytes):
+        if self.line_on_page == 0:
+            self.pages += 1
+        self.file.write(row + b'\r\n')
+        self.line_on_page += 1
+        if self.line_on_page == self.lines_per_page:
+            self.file.write(b'\f')
+            self.line_on_page = 0
+
+    def close(self):
+        """Finish the last page"""
+        self.new_page()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='BRF (ASCII Braille) conversion')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    to_luganda = commands.add_parser('to-luganda', help='Translate a BRF file to Luganda text')
+    to_luganda.add_argument('input')
+    to_luganda.add_argument('-o', '--output', required=True)
+    to_luganda.add_argument('--phonetic', action='store_true', help='Write IPA instead of Luganda')
+
+    from_luganda = commands.add_parser('from-luganda', help='Produce paginated BRF from Luganda text')
+    from_luganda.add_argument('input')
+    from_luganda.add_argument('-o', '--output', required=True)
+    from_luganda.add_argument('--cells', type=int, default=40, help='Cells per line')
+    from_luganda.add_argument('--lines', type=int, default=25, help='Lines per page')
+    args = parser.parse_args()
+
+    engine = TranslationEngine()
+    try:
+        if args.command == 'to-luganda':
+            size = translate_brf_file(engine, args.input, args.output, args.phonetic)
+            print(f"Translated {size:,} bytes of BRF to {args.output}")
+        else:
+            from back_translator import LugandaToBraille
+            translator = LugandaToBraille(engine)
+            with open(args.input, encoding='utf-8') as source, open(args.output, 'wb') as target:
+                writer = BRFWriter(target, args.cells, args.lines)
+                for braille_line in translator.translate_lines(source):
+                    writer.write_unicode(braille_line)
+                writer.close()
+            print(f"Wrote {writer.pages} pages to {args.output}")
+    finally:
+        engine.close()
@@ -1,16 +1,19 @@
-from main_app import BrailleToLugandaApp
-from gtts import gTTS
+from braille_core import BrailleTranslator
+from exporters import FORMATS, detect_format
+from translation_memory import memory_path_for
 import cmd
 import os
+import sys
 
 class BrailleCLI(cmd.Cmd):
     prompt = '(braille-luganda) '
+    intro = "Braille to Luganda Translator\nType 'help' for commands\n"
     
-    def __init__(self):
+    def __init__(self, translation_memory: bool = False):
         super().__init__()
-        self.app = BrailleToLugandaApp()
-        print("Braille to Luganda Translator")
-        print("Type 'help' for commands\n")
+        # Headless core: no window, audio is only initialized by 'speak'
+        memory_path = memory_path_for('braille_luganda.db') if translation_memory else None
+        self.app = BrailleTranslator(memory_path=memory_path)
     
     def do_translate(self, arg):
         """Translate Braille text: translate <braille_text>"""
@@ -22,6 +25,82 @@ class BrailleCLI(cmd.Cmd):
         print("\nTranslation Results:")
         print("Luganda:", ' | '.join(luganda))
         print("Phonetic:", ' | '.join(phonetic))
+        for word, suggestions in self.app.suggest_corrections(arg, limit=3).items():
+            if suggestions:
+                print(f"Did you mean ({word}):", ', '.join(
+                    f"{s.luganda_word} {s.braille_pattern}" for s in suggestions))
+    
+    def do_translatefile(self, arg):
+        """Translate a Braille file (.brf or UTF-8): translatefile <input> <output> [phonetic]"""
+        args = arg.split()
+        if len(args) < 2:
+            print("Please provide an input and an output file")
+            return
+        
+        try:
+            size = self.app.translate_file(args[0], args[1], phonetic='phonetic' in args[2:])
+        except OSError as e:
+            print(f"File error: {e}")
+            return
+        print(f"Translated {size:,} bytes to {args[1]}")
+    
+    def do_exportaudio(self, arg):
+        """Render a UTF-8 Braille file to audio: exportaudio <input> <output.wav|.ogg>"""
+        args = arg.split()
+        if len(args) < 2:
+            print("Please provide an input and an output file")
+            return
+        
+        try:
+            summary = self.app.export_audio(args[0], args[1])
+        except (OSError, RuntimeError) as e:
+            print(f"Export error: {e}")
+            return
+        print(f"Rendered {summary['lines']:,} lines ({summary['seconds']:.1f} s of audio) to {args[1]}")
+    
+    def do_complete(self, arg):
+        """Complete a partly typed Braille word: complete <braille_prefix> [count]"""
+        args = arg.split()
+        if not args:
+            print("Please provide the Braille cells typed so far")
+            return
+        
+        try:
+            limit = int(args[1]) if len(args) > 1 else 5
+        except ValueError:
+            print("Please provide a valid count")
+            return
+        completions = self.app.complete_word(args[0], limit)
+        if not completions:
+            print("No lexicon word starts with those cells")
+            return
+        for c in completions:
+            print(f"{c.braille_pattern} {c.luganda_word} (frequency {c.frequency:,})")
+    
+    def do_suggest(self, arg):
+        """Suggest lexicon words for a mis-dotted Braille word: suggest <braille_word> [speak]"""
+        args = arg.split()
+        if not args:
+            print("Please provide a Braille word")
+            return
+        
+        if 'speak' in args[1:]:
+            suggestions = self.app.speak_suggestions(args[0])
+        else:
+            suggestions = self.app.engine.processor.suggest_words(args[0])
+        if not suggestions:
+            print("No lexicon word is close to that pattern")
+            return
+        for s in suggestions:
+            print(f"{s.braille_pattern} {s.luganda_word} ({s.distance} dot{'s' if s.distance != 1 else ''} off)")
+    
+    def do_braille(self, arg):
+        """Translate Luganda text to Braille: braille <luganda_text>"""
+        if not arg:
+            print("Please provide Luganda text to translate")
+            return
+        
+        print("Braille:", self.app.back_translator.translate(arg))
     
     def do_speak(self, arg):
         """Speak the translation: speak [line_number]"""
@@ -36,34 +115,41 @@ class BrailleCLI(cmd.Cmd):
         if not self.app.speak_translation(line_index):
             print("No translation available or invalid line number")
     
+    def do_speed(self, arg):
+        """Show or set the speech rate: speed [slow|normal|fast|very_fast|<rate>]"""
+        if arg:
+            self.app.settings.set('speech_speed', arg.strip())
+        print(f"Speech speed: {self.app.settings.get('speech_speed')} ({self.app.settings.speech_rate:g}x)")
+    
     def do_analyze(self, arg):
-        """Analyze a Braille word: analyze <braille_word>"""
+        """Analyze Braille words: analyze <braille_text>"""
         if not arg:
             print("Please provide a Braille word to analyze")
             return
         
-        analysis = self.app.get_word_analysis(arg)
-        print("\nWord Analysis:")
-        for key, value in analysis.items():
-            if key == 'character_breakdown':
-                print(f"{key}:")
-                for char in value:
-                    print(f"  - {char['braille_code']}: {char['luganda_char']} ({char.get('description', '')})")
-            else:
-                print(f"{key}: {value}")
+        for analysis in self.app.analyze_text(arg):
+            print("\nWord Analysis:")
+            print(f"braille_pattern: {analysis.braille_pattern}")
+            print(f"luganda_word: {analysis.luganda_word}")
+            if analysis.known:
+                print(f"english_meaning: {analysis.english_meaning}")
+                print(f"category: {analysis.category}")
+            print("character_breakdown:")
+            for char in analysis.characters:
+                print(f"  - {char.braille_code}: {char.luganda_char} ({char.description})")
     
     def do_export(self, arg):
-        """Export translation: export <filename> [json|text]"""
+        """Export translation: export <filename> [jsonl|json|csv|text] (.gz compresses)"""
         args = arg.split()
         if len(args) < 1:
             print("Please provide a filename")
             return
         
         filename = args[0]
-        format = 'json' if len(args) < 2 else args[1]
+        format = args[1] if len(args) > 1 else detect_format(filename)
         
-        if format not in ['json', 'text']:
-            print("Invalid format. Use 'json' or 'text'")
+        if format not in FORMATS:
+            print(f"Invalid format. Use one of: {', '.join(FORMATS)}")
             return
         
         if self.app.export_translation(filename, format):
@@ -71,6 +157,35 @@ class BrailleCLI(cmd.Cmd):
         else:
             print("Export failed. No translation available or file error")
     
+    def do_exportfile(self, arg):
+        """Translate a UTF-8 Braille file into an export: exportfile <input> <output> [jsonl|json|csv|text]"""
+        args = arg.split()
+        if len(args) < 2:
+            print("Please provide an input and an output file")
+            return
+        
+        format = args[2] if len(args) > 2 else detect_format(args[1])
+        if format not in FORMATS:
+            print(f"Invalid format. Use one of: {', '.join(FORMATS)}")
+            return
+        
+        try:
+            count = self.app.export_file(args[0], args[1], format)
+        except OSError as e:
+            print(f"File error: {e}")
+            return
+        print(f"Exported {count:,} lines to {args[1]} ({format})")
+    
+    def do_stats(self, arg):
+        """Show lexicon lookup statistics"""
+        reports = [("Lexicon Lookups", self.app.engine.processor.filter_report())]
+        if self.app.engine.memory is not None:
+            reports.append(("Translation Memory", self.app.engine.memory.report()))
+        for title, report in reports:
+            print(f"\n{title}:")
+            for key, value in report.items():
+                print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value:,}")
+    
     def do_quit(self, arg):
         """Exit the application"""
         self.app.close()
@@ -82,4 +197,12 @@ class BrailleCLI(cmd.Cmd):
         os.system('cls' if os.name == 'nt' else 'clear')
 
 if __name__ == "__main__":
-    BrailleCLI().cmdloop()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # One-shot batch use: python cli_interface.py translate <braille_text>
+        cli = BrailleCLI()
+        cli.onecmd(' '.join(sys.argv[1:]))
+        cli.app.close()
+    else:
+        # An interactive session sees the same text again, so it is cached
+        cli = BrailleCLI(translation_memory=True)
+        cli.cmdloop()
\ No newline at end of file
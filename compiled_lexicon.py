@@ -0,0 +1,184 @@
+"""Compiled, memory-mappable form of the common_words lexicon.
+
+The lexicon is written once as a sorted string table:
+
+    header          magic, format version, lexicon version, entry count,
+                    Bloom filter capacity, hash count and size in bits
+    key offsets     count + 1 native-endian uint32
+    value offsets   count + 1 native-endian uint32
+    keys            UTF-8 Braille patterns, sorted bytewise
+    values          UTF-8 Luganda words, in key order
+    filter          Bloom filter bits over the patterns (see bloom_filter.py)
+
+Opening it is O(1): the file is memory-mapped and nothing is parsed, so
+every process reading the same file shares one copy through the page
+cache. Lookups are a binary search over the mapped keys, and the stored
+filter spares processes from building their own. The file is a build
+artifact for the host that uses it, hence native byte order.
+
+    python compiled_lexicon.py build [--db braille_luganda.db] [-o braille_luganda.lex]
+"""
+import argparse
+import bisect
+import mmap
+import os
+import sqlite3
+import struct
+from array import array
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+from bloom_filter import BloomFilter, capacity_with_headroom, stable_hash
+from lexicon import get_lexicon_version
+
+MAGIC = b'BLEX'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sIQIIII')  # 32 bytes, so the offset arrays are 8-byte aligned
+FILTER_FP_RATE = 0.01
+
+
+def default_path(db_path: Union[str, Path]) -> Path:
+    """Compiled lexicon location for a database: same name, .lex suffix"""
+    return Path(db_path).with_suffix('.lex')
+
+
+def build_compiled_lexicon(conn: sqlite3.Connection, path: Union[str, Path],
+                           filter_fp_rate: float = FILTER_FP_RATE) -> int:
+    """Compile common_words into path; returns the number of entries"""
+    entries = {}
+    for pattern, word in conn.execute('SELECT braille_pattern, luganda_word FROM common_words ORDER BY id'):
+        entries[pattern.encode('utf-8')] = word.encode('utf-8')
+    keys = sorted(entries)
+
+    word_filter = BloomFilter(capacity_with_headroom(len(keys)), filter_fp_rate, hash_function=stable_hash)
+    word_filter.update(key.decode('utf-8') for key in keys)
+
+    key_offsets, value_offsets = array('I', [0]), array('I', [0])
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(entries[key]))
+
+    # Written next to the target and renamed, so processes that already
+    # mapped the old file keep a consistent view
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, get_lexicon_version(conn), len(keys),
+                            word_filter.capacity, word_filter.num_hashes, word_filter.num_bits))
+        f.write(key_offsets.tobytes())
+        f.write(value_offsets.tobytes())
+        f.write(b''.join(keys))
+        f.write(b''.join(entries[key] for key in keys))
+        f.write(word_filter.bits)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class _KeyView:
+    """Sequence of the mapped keys, for bisect"""
+    def __init__(self, lexicon: 'CompiledLexicon'):
+        self.lexicon = lexicon
+
+    def __len__(self):
+        return self.lexicon.count
+
+    def __getitem__(self, i: int) -> bytes:
+        offsets = self.lexicon.key_offsets
+        base = self.lexicon.keys_start
+        return self.lexicon.mm[base + offsets[i]:base + offsets[i + 1]]
+
+
+class CompiledLexicon:
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.mm) < HEADER.size:
+            self.mm.close()
+            raise ValueError(f"{self.path} is not a compiled lexicon (format {FORMAT_VERSION})")
+        (magic, format_version, self.version, self.count,
+         self.filter_capacity, self.filter_hashes, self.filter_bits) = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self.mm.close()
+            raise ValueError(f"{self.path} is not a compiled lexicon (format {FORMAT_VERSION})")
+
+        n = self.count + 1
+        self._view = memoryview(self.mm)
+        self.key_offsets = self._view[HEADER.size:HEADER.size + 4 * n].cast('I')
+        self.value_offsets = self._view[HEADER.size + 4 * n:HEADER.size + 8 * n].cast('I')
+        self.keys_start = HEADER.size + 8 * n
+        self.values_start = self.keys_start + self.key_offsets[self.count]
+        self.filter_start = self.values_start + self.value_offsets[self.count]
+        if self.filter_start + (self.filter_bits + 7) // 8 != len(self.mm):
+            self.close()
+            raise ValueError(f"{self.path} is truncated or corrupt")
+        self._keys = _KeyView(self)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, key: bytes) -> int:
+        i = bisect.bisect_left(self._keys, key)
+        return i if i < self.count and self._keys[i] == key else -1
+
+    def _value(self, i: int) -> str:
+        start = self.values_start + self.value_offsets[i]
+        end = self.values_start + self.value_offsets[i + 1]
+        return self.mm[start:end].decode('utf-8')
+
+    def get(self, braille_pattern: str) -> Optional[str]:
+        """Luganda word for a Braille pattern, or None"""
+        i = self._find(braille_pattern.encode('utf-8'))
+        return self._value(i) if i >= 0 else None
+
+    def __contains__(self, braille_pattern: str) -> bool:
+        return self._find(braille_pattern.encode('utf-8')) >= 0
+
+    def word_filter(self) -> BloomFilter:
+        """A copy of the stored Bloom filter, which the caller may add to"""
+        bits = bytearray(self.mm[self.filter_start:self.filter_start + (self.filter_bits + 7) // 8])
+        return BloomFilter.from_bits(bits, self.filter_bits, self.filter_hashes,
+                                     self.filter_capacity, self.count)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """All (braille_pattern, luganda_word) pairs in key order"""
+        for i in range(self.count):
+            yield self._keys[i].decode('utf-8'), self._value(i)
+
+    def close(self):
+        self.key_offsets.release()
+        self.value_offsets.release()
+        self._view.release()
+        self.mm.close()
+
+
+def open_compiled_lexicon(conn: sqlite3.Connection, path: Union[str, Path]) -> Optional[CompiledLexicon]:
+    """Open path if it exists and matches the database's lexicon version"""
+    if not Path(path).exists():
+        return None
+    try:
+        lexicon = CompiledLexicon(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring compiled lexicon {path}: {e}")
+        return None
+    if lexicon.version != get_lexicon_version(conn):
+        print(f"Compiled lexicon {path} is out of date; rebuild it with compiled_lexicon.py build")
+        lexicon.close()
+        return None
+    return lexicon
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compile the common_words lexicon for memory mapping')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Compile the lexicon')
+    build.add_argument('--db', default='braille_luganda.db', help='Lexicon database')
+    build.add_argument('-o', '--output', help='Output file (default: database name with .lex)')
+    args = parser.parse_args()
+
+    output = args.output or default_path(args.db)
+    conn = sqlite3.connect(args.db)
+    try:
+        count = build_compiled_lexicon(conn, output)
+    finally:
+        conn.close()
+    print(f"Compiled {count:,} entries into {output} ({Path(output).stat().st_size:,} bytes)")
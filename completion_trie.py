@@ -0,0 +1,123 @@
+"""Frequency-weighted prefix completion over lexicon Braille patterns.
+
+PrefixTrie answers "the k most frequent lexicon words starting with these
+cells" while a word is being typed. Every trie node (prefix) with more than
+TOP_K words below it stores its top TOP_K entries, so a lookup is one dict
+probe plus a slice: O(prefix length + k). Smaller subtrees store nothing;
+their few words are found by a bisect into the sorted pattern list.
+Keeping only the heavy nodes makes the trie a fraction of the size of one
+with a node per prefix.
+
+New entries are added incrementally: the sorted list gets one insort and
+each heavy prefix of the pattern one bounded insertion.
+"""
+import bisect
+import heapq
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Entries kept per heavy prefix (the largest k a lookup can ask for)
+TOP_K = 8
+
+
+class Completion(NamedTuple):
+    braille_pattern: str
+    luganda_word: str
+    frequency: int
+
+
+def _rank(entry: Completion) -> Tuple[int, int, str]:
+    # Most frequent first, then shortest, then in pattern order
+    return -entry.frequency, len(entry.braille_pattern), entry.braille_pattern
+
+
+class PrefixTrie:
+    def __init__(self, entries: Iterable[Tuple[str, str, int]] = (), top_k: int = TOP_K):
+        self.top_k = top_k
+        self.entries: Dict[str, Completion] = {}
+        self.patterns: List[str] = []
+        # Heavy prefix -> its best top_k entries, best first
+        self.top: Dict[str, List[Completion]] = {}
+        self._build(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _build(self, entries: Iterable[Tuple[str, str, int]]):
+        for pattern, word, frequency in entries:
+            if pattern:
+                self.entries[pattern] = Completion(pattern, word, frequency or 0)
+        patterns = self.patterns = sorted(self.entries)
+        ordered = sorted(self.entries.values(), key=_rank)
+        position = {entry.braille_pattern: i for i, entry in enumerate(ordered)}
+        # Rank of each pattern, in pattern order, so a subtree's best
+        # entries are the smallest ints of a slice
+        ranks = [position[pattern] for pattern in patterns]
+
+        # Heavy prefixes are found by splitting sorted ranges on the next
+        # cell, descending only into ranges larger than top_k
+        top_k = self.top_k
+        stack = [('', 0, len(patterns))]
+        while stack:
+            prefix, start, end = stack.pop()
+            if end - start <= top_k:
+                continue
+            self.top[prefix] = [ordered[rank] for rank in heapq.nsmallest(top_k, ranks[start:end])]
+            depth = len(prefix)
+            if len(patterns[start]) == depth:
+                start += 1  # the prefix itself is a word
+            while start < end:
+                child = patterns[start][:depth + 1]
+                child_end = bisect.bisect_left(patterns, child + '\U0010ffff', start, end)
+                stack.append((child, start, child_end))
+                start = child_end
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        """Slice of self.patterns starting with prefix"""
+        start = bisect.bisect_left(self.patterns, prefix)
+        end = bisect.bisect_left(self.patterns, prefix + '\U0010ffff', start)
+        return start, end
+
+    def _scan(self, prefix: str) -> List[Completion]:
+        start, end = self._range(prefix)
+        return sorted((self.entries[p] for p in self.patterns[start:end]), key=_rank)
+
+    def complete(self, prefix: str, k: int = 5) -> List[Completion]:
+        """Up to k entries whose pattern starts with prefix, most frequent first"""
+        k = min(k, self.top_k)
+        best = self.top.get(prefix)
+        if best is not None:
+            return best[:k]
+        # Not heavy: at most top_k patterns start with prefix
+        return self._scan(prefix)[:k]
+
+    def add(self, braille_pattern: str, luganda_word: str, frequency: Optional[int] = None):
+        """Add an entry or update its word and frequency (kept when frequency is None)"""
+        if not braille_pattern:
+            return
+        previous = self.entries.get(braille_pattern)
+        if frequency is None:
+            frequency = previous.frequency if previous else 0
+        entry = Completion(braille_pattern, luganda_word, frequency)
+        self.entries[braille_pattern] = entry
+        if previous is None:
+            bisect.insort(self.patterns, braille_pattern)
+
+        for end in range(len(braille_pattern) + 1):
+            prefix = braille_pattern[:end]
+            best = self.top.get(prefix)
+            if best is None:
+                start, stop = self._range(prefix)
+                if stop - start <= self.top_k:
+                    break  # no longer prefix is heavy either
+                # This prefix just became heavy
+                self.top[prefix] = self._scan(prefix)[:self.top_k]
+                continue
+            if previous is not None and previous in best:
+                best.remove(previous)
+                if len(best) < self.top_k and frequency < previous.frequency:
+                    # Something else below this prefix may now rank higher
+                    self.top[prefix] = self._scan(prefix)[:self.top_k]
+                    continue
+            if len(best) < self.top_k or _rank(entry) < _rank(best[-1]):
+                bisect.insort(best, entry, key=_rank)
+                del best[self.top_k:]
@@ -1,5 +1,7 @@
 import sqlite3
 from pathlib import Path
+from lexicon import ensure_lexicon_schema
+from table_compiler import load_table
 
 def create_database():
     """Initialize the SQLite database with required tables"""
@@ -30,7 +32,8 @@ def create_database():
         braille_pattern TEXT NOT NULL,
         luganda_word TEXT NOT NULL,
         english_meaning TEXT,
-        category TEXT
+        category TEXT,
+        frequency INTEGER NOT NULL DEFAULT 0
     )
     ''')
     
@@ -44,34 +47,10 @@ def create_database():
     ''')
     
     
-    # Some of the basic Luganda Braille mappings (6-dot Braille)
+    # Single-cell Braille mappings (6-dot Braille) from the translation table
     basic_mappings = [
-        ('⠁', 'a', 'a', 'Luganda vowel a'),
-        ('⠃', 'b', 'b', 'Luganda consonant b'),
-        ('⠉', 'c', 'tʃ', 'Luganda consonant c (ch sound)'),
-        ('⠙', 'd', 'd', 'Luganda consonant d'),
-        ('⠑', 'e', 'e', 'Luganda vowel e'),
-        ('⠋', 'f', 'f', 'Luganda consonant f'),
-        ('⠛', 'g', 'g', 'Luganda consonant g'),
-        ('⠓', 'h', 'h', 'Luganda consonant h'),
-        ('⠊', 'i', 'i', 'Luganda vowel i'),
-        ('⠚', 'j', 'dʒ', 'Luganda consonant j (j sound)'),
-        ('⠅', 'k', 'k', 'Luganda consonant k'),
-        ('⠇', 'l', 'l', 'Luganda consonant l'),
-        ('⠍', 'm', 'm', 'Luganda consonant m'),
-        ('⠝', 'n', 'n', 'Luganda consonant n'),
-        ('⠕', 'o', 'o', 'Luganda vowel o'),
-        ('⠏', 'p', 'p', 'Luganda consonant p'),
-        ('⠟', 'q', '', 'Luganda consonant q (not used)'),
-        ('⠗', 'r', 'r', 'Luganda consonant r'),
-        ('⠎', 's', 's', 'Luganda consonant s'),
-        ('⠞', 't', 't', 'Luganda consonant t'),
-        ('⠥', 'u', 'u', 'Luganda vowel u'),
-        ('⠧', 'v', 'v', 'Luganda consonant v'),
-        ('⠭', 'w', 'w', 'Luganda consonant w'),
-        ('⠽', 'x', '', 'Luganda consonant x (not used)'),
-        ('⠾', 'y', 'y', 'Luganda consonant y'),
-        ('⠵', 'z', 'z', 'Luganda consonant z'),
+        (chr(0x2800 + mask), letters, ipa, description)
+        for mask, letters, ipa, description in load_table().letters
     ]
     
     cursor.executemany(
@@ -91,12 +70,15 @@ def create_database():
         'INSERT INTO common_words (braille_pattern, luganda_word, english_meaning, category) VALUES (?, ?, ?, ?)',
         common_words
     )
+    # Pattern index and lexicon version; large lexicons go through lexicon_import.py
+    ensure_lexicon_schema(conn)
     
     # Set default user settings
     default_settings = [
         ('speech_speed', 'normal'),
         ('voice_gender', 'female'),
         ('audio_volume', '100'),
+        ('audio_output', 'pygame'),
     ]
     
     cursor.executemany(
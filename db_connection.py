@@ -0,0 +1,79 @@
+"""Per-thread SQLite connections for the lexicon database.
+
+sqlite3 connections must not be shared between threads, but input
+callbacks (pynput, Tk, timers), service threads and batch workers all need
+to read the lexicon. ConnectionManager gives every thread its own
+connection, opened lazily with tuned pragmas, and keeps a large statement
+cache so the handful of lookup queries are prepared once per connection.
+
+WAL journaling lets readers run alongside a writer, but journal_mode is
+stored in the database file itself, so it is opt-in (wal=True) and only
+used for databases created at runtime. The lexicon database is tracked in
+the repository and keeps its rollback journal.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 512
+
+DEFAULT_PRAGMAS = {
+    'cache_size': -16384,        # 16 MiB page cache (negative means KiB)
+    'mmap_size': 268435456,      # read pages through a 256 MiB memory map
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,        # ms to wait on a writer instead of failing
+}
+
+
+class ConnectionManager:
+    def __init__(self, db_path: Union[str, Path] = 'braille_luganda.db', read_only: bool = False,
+                 pragmas: Optional[Dict[str, Union[str, int]]] = None, wal: bool = False):
+        self.db_path = str(db_path)
+        self.read_only = read_only
+        # NORMAL skips an fsync per commit and is only safe with WAL; a
+        # rollback journal needs FULL to survive power loss
+        synchronous = {'synchronous': 'NORMAL' if wal else 'FULL'}
+        self.pragmas = dict(DEFAULT_PRAGMAS, **synchronous, **(pragmas or {}))
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        if wal and not read_only:
+            # journal_mode is stored in the database file, so this is done once
+            self.connection().execute('PRAGMA journal_mode=WAL')
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # Enable dictionary-like access
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name}={value}')
+        return conn
+
+    def close(self):
+        """Close the connections of all threads"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing database connection: {e}")
+        self._local = threading.local()
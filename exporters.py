@@ -0,0 +1,134 @@
+"""Streaming exporters for translation results.
+
+Exporters consume an iterator of TranslationRecord and write each record
+as it arrives through a buffered (optionally gzip-compressed) text stream,
+so exporting a corpus uses constant memory however large it is.
+
+    records = iter_records(engine, open('book.txt', encoding='utf-8'))
+    export_records(records, 'book.jsonl.gz')
+
+Formats: jsonl (one object per line), json (a streamed array), csv and
+text (Luganda only). The format and compression are taken from the file
+name unless given explicitly.
+"""
+import csv
+import gzip
+import io
+import json
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, NamedTuple, Optional, TextIO
+
+# Bytes buffered before a write reaches the file (or the compressor)
+BUFFER_SIZE = 1 << 20
+FORMATS = ('jsonl', 'json', 'csv', 'text')
+
+
+class TranslationRecord(NamedTuple):
+    """One translated line and where it came from in the source"""
+    line: int   # 1-based source line number
+    start: int  # character offsets of the Braille text in the source
+    end: int
+    braille: str
+    luganda: str
+    phonetic: str
+
+
+def iter_records(engine, lines: Iterable[str]) -> Iterator[TranslationRecord]:
+    """Translate lines (with their line endings, as read from a file) lazily"""
+    offset = 0
+    for number, raw in enumerate(lines, 1):
+        braille = raw.strip()
+        if braille:
+            start = offset + raw.index(braille)
+            luganda, phonetic = engine.translate(braille)
+            yield TranslationRecord(number, start, start + len(braille), braille, luganda, phonetic)
+        offset += len(raw)
+
+
+def open_output(path: str, compress: Optional[bool] = None) -> TextIO:
+    """Buffered UTF-8 text stream for path, gzip-compressed for .gz or when compress is set"""
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        raw = gzip.open(path, 'wb', compresslevel=6)
+        return io.TextIOWrapper(io.BufferedWriter(raw, BUFFER_SIZE), encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='', buffering=BUFFER_SIZE)
+
+
+def detect_format(path: str) -> str:
+    """Export format from a file name such as book.csv or book.jsonl.gz"""
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = name.rsplit('.', 1)[-1].lower()
+    return {'txt': 'text', 'ndjson': 'jsonl'}.get(extension, extension if extension in FORMATS else 'jsonl')
+
+
+class Exporter(ABC):
+    """Writes records one at a time to a text stream"""
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.count = 0
+
+    def begin(self):
+        pass
+
+    @abstractmethod
+    def write(self, record: TranslationRecord):
+        """Write one record"""
+
+    def end(self):
+        pass
+
+    def write_all(self, records: Iterable[TranslationRecord]) -> int:
+        self.begin()
+        for record in records:
+            self.write(record)
+            self.count += 1
+        self.end()
+        return self.count
+
+
+class JSONLExporter(Exporter):
+    def write(self, record: TranslationRecord):
+        self.stream.write(json.dumps(record._asdict(), ensure_ascii=False))
+        self.stream.write('\n')
+
+
+class JSONExporter(Exporter):
+    """A JSON array, written element by element"""
+    def begin(self):
+        self.stream.write('[')
+
+    def write(self, record: TranslationRecord):
+        self.stream.write(',\n  ' if self.count else '\n  ')
+        self.stream.write(json.dumps(record._asdict(), ensure_ascii=False))
+
+    def end(self):
+        self.stream.write('\n]\n' if self.count else ']\n')
+
+
+class CSVExporter(Exporter):
+    def begin(self):
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(TranslationRecord._fields)
+
+    def write(self, record: TranslationRecord):
+        self.writer.writerow(record)
+
+
+class TextExporter(Exporter):
+    def write(self, record: TranslationRecord):
+        self.stream.write(record.luganda)
+        self.stream.write('\n')
+
+
+EXPORTERS = {'jsonl': JSONLExporter, 'json': JSONExporter, 'csv': CSVExporter, 'text': TextExporter}
+
+
+def export_records(records: Iterable[TranslationRecord], path: str,
+                   format: Optional[str] = None, compress: Optional[bool] = None) -> int:
+    """Write records to path; returns the number written"""
+    format = format or detect_format(path)
+    if format not in EXPORTERS:
+        raise ValueError(f"Unknown export format {format!r}; use one of {', '.join(FORMATS)}")
+    with open_output(path, compress) as stream:
+        return EXPORTERS[format](stream).write_all(records)
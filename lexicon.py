@@ -0,0 +1,61 @@
+"""Lexicon schema helpers shared by the importer and the lexicon caches.
+
+The lexicon is the common_words table. Every bulk change bumps a version
+number stored in lexicon_meta, which caches built from the lexicon use to
+notice that they are stale. Each word has a usage frequency, which ranks
+completions; databases created before the column existed read as 0.
+"""
+import sqlite3
+
+PATTERN_INDEX = 'idx_common_words_pattern'
+
+
+def ensure_lexicon_schema(conn: sqlite3.Connection):
+    """Create the lexicon version table and the pattern index if missing"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS lexicon_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO lexicon_meta (key, value) VALUES ('version', '1')")
+    if not has_frequency(conn):
+        conn.execute('ALTER TABLE common_words ADD COLUMN frequency INTEGER NOT NULL DEFAULT 0')
+    has_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (PATTERN_INDEX,)
+    ).fetchone()
+    if not has_index:
+        # Older databases may repeat patterns, which the unique index forbids
+        remove_duplicate_patterns(conn)
+        conn.execute(f'CREATE UNIQUE INDEX {PATTERN_INDEX} ON common_words (braille_pattern)')
+
+
+def remove_duplicate_patterns(conn: sqlite3.Connection):
+    """Keep only the last row (highest id) for every braille_pattern"""
+    conn.execute(
+        'DELETE FROM common_words WHERE id NOT IN '
+        '(SELECT MAX(id) FROM common_words GROUP BY braille_pattern)'
+    )
+
+
+def has_frequency(conn: sqlite3.Connection) -> bool:
+    """Whether common_words has the frequency column"""
+    return any(row[1] == 'frequency' for row in conn.execute('PRAGMA table_info(common_words)'))
+
+
+def get_lexicon_version(conn: sqlite3.Connection) -> int:
+    """Current lexicon version; 0 for databases that predate lexicon_meta"""
+    try:
+        row = conn.execute("SELECT value FROM lexicon_meta WHERE key = 'version'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row else 0
+
+
+def bump_lexicon_version(conn: sqlite3.Connection) -> int:
+    """Record that common_words changed; returns the new version"""
+    version = get_lexicon_version(conn) + 1
+    conn.execute(
+        "INSERT OR REPLACE INTO lexicon_meta (key, value) VALUES ('version', ?)", (str(version),)
+    )
+    return version
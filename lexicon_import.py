@@ -0,0 +1,163 @@
+"""Bulk import of Luganda lexicons into common_words.
+
+Reads CSV, TSV (with a header row) or JSONL records with the fields
+luganda_word (required), braille_pattern, english_meaning, category and
+frequency (a usage count that ranks completions; 0 when missing). When
+braille_pattern is missing it is computed with LugandaToBraille.
+
+Rows are streamed into executemany in large batches within a single
+transaction with relaxed durability, so a failed import leaves the lexicon
+as it was. Secondary indexes are dropped for the load and rebuilt after,
+and duplicate patterns are resolved in favour of the last row imported.
+
+    python lexicon_import.py words.tsv [--db braille_luganda.db] [--batch-size 100000]
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from lexicon import PATTERN_INDEX, bump_lexicon_version, ensure_lexicon_schema, remove_duplicate_patterns
+
+FIELDS = ('braille_pattern', 'luganda_word', 'english_meaning', 'category', 'frequency')
+
+
+def read_records(path: str, format: Optional[str] = None) -> Iterator[Tuple]:
+    """Stream (braille_pattern, luganda_word, english_meaning, category, frequency) tuples
+
+    Missing fields are None.
+    """
+    format = format or Path(path).suffix.lstrip('.').lower()
+    with open(path, encoding='utf-8', newline='') as f:
+        if format == 'jsonl':
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield tuple(record.get(field) for field in FIELDS)
+        elif format in ('csv', 'tsv', 'txt'):
+            reader = csv.reader(f, delimiter=',' if format == 'csv' else '\t')
+            header = [name.strip() for name in next(reader, [])]
+            if 'luganda_word' not in header:
+                raise ValueError("Lexicon header must include a luganda_word column")
+            columns = [header.index(field) if field in header else None for field in FIELDS]
+            for row in reader:
+                yield tuple(
+                    row[i] if i is not None and i < len(row) else None for i in columns
+                )
+        else:
+            raise ValueError(f"Unsupported lexicon format '{format}' (use csv, tsv or jsonl)")
+
+
+def to_rows(records: Iterable[Tuple],
+            braille_for: Callable[[str], str]) -> Iterator[Tuple[str, str, str, str, int]]:
+    """Turn records into common_words rows, computing missing Braille patterns"""
+    for pattern, word, meaning, category, frequency in records:
+        word = (word or '').strip()
+        if not word:
+            continue
+        pattern = (pattern or '').strip() or braille_for(word)
+        try:
+            frequency = int(float(frequency or 0))
+        except ValueError:
+            raise ValueError(f"Invalid frequency {frequency!r} for {word!r}")
+        yield pattern, word, meaning or None, category or None, frequency
+
+
+def import_rows(conn: sqlite3.Connection, rows: Iterable[Tuple], batch_size: int = 100_000,
+                progress: Callable[[int, float], None] = None) -> int:
+    """Load rows into common_words; returns the number of rows read
+
+    On any error the whole import is rolled back and the error re-raised.
+    """
+    ensure_lexicon_schema(conn)
+    conn.commit()
+
+    journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+    conn.execute('PRAGMA journal_mode=MEMORY')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA cache_size=-262144')  # 256 MiB while loading
+
+    start = time.perf_counter()
+    total = 0
+    rows = iter(rows)
+    try:
+        # Explicit, so the index drops below are rolled back too
+        conn.execute('BEGIN')
+        # Indexes are rebuilt once at the end instead of updated row by row
+        indexes = conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'common_words' AND sql IS NOT NULL"
+        ).fetchall()
+        for name, _ in indexes:
+            conn.execute(f'DROP INDEX {name}')
+
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            conn.executemany(
+                'INSERT INTO common_words (braille_pattern, luganda_word, english_meaning, category, frequency) '
+                'VALUES (?, ?, ?, ?, ?)',
+                batch
+            )
+            total += len(batch)
+            if progress:
+                progress(total, time.perf_counter() - start)
+
+        # Keep the last row for every pattern, so re-imports update entries
+        remove_duplicate_patterns(conn)
+        for name, sql in indexes:
+            if name != PATTERN_INDEX:
+                conn.execute(sql)
+        ensure_lexicon_schema(conn)
+        bump_lexicon_version(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA journal_mode={journal_mode}')
+    return total
+
+
+def _print_progress(rows: int, elapsed: float):
+    print(f"\r{rows:,} rows, {rows / max(elapsed, 1e-9):,.0f} rows/s", end='', flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Bulk import a Luganda lexicon into common_words')
+    parser.add_argument('input', help='CSV, TSV or JSONL lexicon file')
+    parser.add_argument('--db', default='braille_luganda.db', help='Lexicon database')
+    parser.add_argument('--format', choices=['csv', 'tsv', 'jsonl'], help='Default: from the file extension')
+    parser.add_argument('--batch-size', type=int, default=100_000, help='Rows per executemany batch')
+    args = parser.parse_args()
+
+    from back_translator import LugandaToBraille
+    from translation_engine import TranslationEngine
+
+    engine = TranslationEngine(args.db)
+    back_translator = LugandaToBraille(engine)
+    # The importer needs the database to itself to change journal settings
+    engine.close()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        start = time.perf_counter()
+        rows = to_rows(read_records(args.input, args.format), back_translator.translate_word)
+        total = import_rows(conn, rows, args.batch_size, _print_progress)
+        elapsed = time.perf_counter() - start
+        count = conn.execute('SELECT COUNT(*) FROM common_words').fetchone()[0]
+        print(f"\nImported {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s); "
+              f"common_words now has {count:,} entries")
+
+        # Keep an existing compiled lexicon in step with the database
+        from compiled_lexicon import build_compiled_lexicon, default_path
+        if default_path(args.db).exists():
+            build_compiled_lexicon(conn, default_path(args.db))
+            print(f"Rebuilt compiled lexicon {default_path(args.db)}")
+    finally:
+        conn.close()
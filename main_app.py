@@ -1,19 +1,16 @@
 from translation_engine import TranslationEngine
 from audio_system import AudioSystem
-from typing import List, Tuple, Optional, Union
-import json
+from audio_sinks import create_sink
+from braille_cell import DOT_BITS, EMPTY, FULL, Cell, as_cell
+from settings import UserSettings
+from typing import Tuple, Optional
 import argparse
+import os
 import sys
-import time
 from io import BytesIO
-import base64
 import pygame
 import threading
-import tkinter as tk
-from gtts import gTTS
-from braille_input.gui import GUIInput
-from braille_input.physical import PhysicalDeviceInput
-from braille_input.keyboard import KeyboardInput
+from braille_input import INPUT_METHODS, create_input
 
 COLORS = {
     'background': (240, 240, 250), # Light lavender
@@ -24,8 +21,22 @@ COLORS = {
     'braille_cell': (180, 180, 255) # Light blue
 }
 
+# All six dots at once accept the top completion (the cell is not used by
+# the Luganda table); an empty cell (Space alone) ends the word
+ACCEPT_CHORD = FULL
+COMPLETIONS_SHOWN = 3
+# Closest lexicon words offered when a finished word is not in the lexicon
+SUGGESTIONS_SHOWN = 3
+
 class BrailleToLugandaApp:
-    def __init__(self, input_method: str = "keyboard"):
+    def __init__(self, input_method: str = "keyboard", input_options: Optional[dict] = None,
+                 record_path: Optional[str] = None, audio_output: Optional[str] = None):
+        # audio_output overrides the audio_output setting; without a sound
+        # card to play to, the mixer must not open one either
+        sink = create_sink(audio_output) if audio_output else None
+        if sink is not None and not sink.needs_device:
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
         # Initialize Pygame
         pygame.init()
         pygame.font.init()
@@ -34,23 +45,17 @@ class BrailleToLugandaApp:
         self.screen = pygame.display.set_mode((800, 600), pygame.HWSURFACE | pygame.DOUBLEBUF)
         pygame.display.set_caption("Braille to Luganda Translator")
         
-        #initialize mixer
-        try:
-            pygame.mixer.init()
-        except:
-            print("Audio mixer initialization failed")
-        
+        # The mixer is initialized by AudioSystem on first playback
         #rest of initialization
-        self._initialize_components(input_method)
+        self._initialize_components(input_method, input_options or {}, record_path, sink)
         
         # Force initial render
         self._update_display()
         pygame.display.flip()
-    def _initialize_components(self, input_method):
+    def _initialize_components(self, input_method, input_options, record_path, sink):
             
-        self.audio = AudioSystem()
+        self.audio = AudioSystem(UserSettings(), sink)
         self.braille_cell_pos = (500, 100)
-        self.current_dots = set()
         self.display_text = ""
 
         # Fonts with multiple fallbacks
@@ -61,21 +66,25 @@ class BrailleToLugandaApp:
         # Core components
         self.engine = TranslationEngine()
         self.current_translation = None
+
+        # Word being typed (Unicode Braille cells) and its completions, and
+        # corrections for the last word if it was not in the lexicon
+        self.current_word = []
+        self.completions = []
+        self.suggestions = []
+        # Build the completion trie now, off the input thread
+        threading.Thread(target=self.engine.processor.completion_trie, daemon=True).start()
         
         # Initialize TTS status
         self.tts_available = True
         self.active_tts = None  # Will hold current TTS playback
         
-        # Input handler setup
-        self.input_methods = {
-            "keyboard": KeyboardInput(),
-            "gui": GUIInput(),
-            "physical": PhysicalDeviceInput()
-        }
-        self.input_handler = self._setup_input_method(input_method)
+        # Input handler setup (only the selected backend is imported)
+        self.input_method = input_method
+        self.input_handler = self._setup_input_method(input_method, input_options, record_path)
         
         # State tracking
-        self.current_input = []
+        self.current_input = EMPTY  # last chord, as a Cell
         self.last_translation = ""
         self.running = True
         self.is_playing = False
@@ -97,18 +106,8 @@ class BrailleToLugandaApp:
     
     def _start_input_listening(self):
         """Start listening for input based on selected method"""
-        if isinstance(self.input_handler, GUIInput):
-            # GUI needs special thread handling
-            if threading.current_thread() is threading.main_thread():
-                self.input_handler.listen(self._process_braille_input)
-            else:
-                threading.Thread(
-                    target=self.input_handler.listen,
-                    args=(self._process_braille_input,),
-                    daemon=True
-                ).start()
-        else:
-            self.input_handler.listen(self._process_braille_input)
+        # Every backend delivers chords from its own thread or process
+        self.input_handler.listen(self._process_braille_input)
     
     def _update_display(self):
         """Safely update the display with error handling"""
@@ -123,20 +122,21 @@ class BrailleToLugandaApp:
             pygame.draw.rect(self.screen, COLORS['braille_cell'], (*self.braille_cell_pos, 200, 300))
             
             # Draw dots
-            active_dots = self._normalize_dots(self.current_input)
+            cell = self.current_input
             
             for dot in range(1, 7):
                 pos = self._get_dot_position(dot)
-                color = (0, 0, 0) if dot in active_dots else (200, 200, 200)
+                raised = cell & DOT_BITS[dot]
+                color = (0, 0, 0) if raised else (200, 200, 200)
                 pygame.draw.circle(self.screen, color, pos, 15)
                 
                 # Show dot numbers
-                if dot in active_dots:
+                if raised:
                     num_text = self.small_font.render(str(dot), True, (255,255,255))
                     self.screen.blit(num_text, (pos[0]-5, pos[1]-8))
                 
             # Current input
-            input_text = self.small_font.render(f"Pressed: {active_dots}", True, COLORS['input'])
+            input_text = self.small_font.render(f"Pressed: {list(cell.dots)}", True, COLORS['input'])
             self.screen.blit(input_text, (20, 80))
             
             # Translation
@@ -146,17 +146,28 @@ class BrailleToLugandaApp:
                 trans_text = self.font.render(f"Translation: {self.last_translation}", True, COLORS['translation'])
                 self.screen.blit(trans_text, (30, 130))
             
+            # Completions of the word being typed
+            if self.completions:
+                words = ', '.join(c.luganda_word for c in self.completions)
+                completion_text = self.small_font.render(f"Complete: {words}", True, COLORS['translation'])
+                self.screen.blit(completion_text, (20, 190))
+            elif self.suggestions:
+                words = ', '.join(s.luganda_word for s in self.suggestions)
+                suggestion_text = self.small_font.render(f"Did you mean: {words}", True, COLORS['input'])
+                self.screen.blit(suggestion_text, (20, 190))
+            
             # Instructions
             instructions = [
                 "Instructions:",
                 "Press Dot 1 to 6 on virtual keyboard",
                 "F(1)/D(2)/S(3)/J(4)/K(5)/L(6): are mapped respectively",
-                "Space: Used to submit"
+                "Space: Used to submit",
+                "All six dots: accept completion; Space alone: next word"
             ]
                 
             for i, line in enumerate(instructions):
                 text = self.small_font.render(line, True, COLORS['instructions'])
-                self.screen.blit(text, (20, 200 + i * 30))
+                self.screen.blit(text, (20, 230 + i * 30))
             
             pygame.display.flip()
         except Exception as e:
@@ -179,18 +190,6 @@ class BrailleToLugandaApp:
         }
         return positions.get(dot, (0, 0))
 
-    def _normalize_dots(self, dots: Union[str, List[int], None]) -> List[int]:
-        """Safely convert dots to standard list format"""
-        if not dots:
-            return []
-        if isinstance(dots, str):
-            try:
-                clean_str = dots.strip('[]')
-                return [int(d) for d in clean_str.split(',') if d.strip().isdigit()]
-            except ValueError:
-                return []
-        return [int(d) for d in dots]
-
     def start_listening(self):
         """Main application loop"""
         clock = pygame.time.Clock()
@@ -209,39 +208,58 @@ class BrailleToLugandaApp:
                 print(f"pygame error:{e}")
                 self.running = False
         
-    def _setup_input_method(self, method: str):
-        """Initialize the selected input method"""
-        try:
-            return self.input_methods[method]
-        except KeyError:
+    def _setup_input_method(self, method: str, options: dict, record_path: Optional[str] = None):
+        """Initialize the selected input method, logging its events to record_path if given"""
+        if method not in INPUT_METHODS:
             print(f"Invalid input method '{method}'. Defaulting to keyboard.")
-            return self.input_methods["keyboard"]
+            method, options = "keyboard", {}
+        self.input_method = method
+        handler = create_input(method, **options)
+        if record_path:
+            from braille_input.replay import RecordingInput
+            handler = RecordingInput(handler, record_path)
+        return handler
 
-    def _process_braille_input(self, dots):
-        """Handle incoming Braille dots"""
-        if not dots:
+    def _process_braille_input(self, cell: Cell):
+        """Handle an incoming chord (a Cell; lists of dots are still accepted)"""
+        cell = as_cell(cell)
+        if not cell:
+            # Word boundary; a word not in the lexicon gets corrections
+            if self.current_word:
+                threading.Thread(target=self._suggest_corrections,
+                                 args=(''.join(self.current_word),), daemon=True).start()
+            self.current_word = []
+            self.completions = []
+            self._update_display()
+            return
+        
+        if cell == ACCEPT_CHORD and self.completions:
+            self._accept_completion()
             return
         
         try:
-            self.current_input = dots
+            self.current_input = cell
             
             # 1. Play dot confirmation sounds
-            self._play_dot_sound(dots)
+            self._play_dot_sound(cell)
             
             # Get translation after dots finish
-            luganda, _ = self.engine.translate(dots)
+            luganda, _ = self.engine.translate_cell(cell)
             if luganda:
-                self.display_text = luganda[0]
+                self.display_text = luganda
                 self.last_translation = self.display_text
                 
                 # 3. Delay translation audio by the remaining dot sound duration
-                translation_delay = self._calculate_remaining_dot_duration(dots)
+                translation_delay = self._calculate_remaining_dot_duration(cell)
                 threading.Timer(translation_delay,
                         lambda: self.audio.play_translation(self.display_text, 'lg')).start()
             else:
                 self.display_text = ""
                 self.last_translation = "No translation found"
                 
+            self.current_word.append(cell.char)
+            self.suggestions = []
+            self.completions = self.engine.complete_word(''.join(self.current_word), COMPLETIONS_SHOWN)
             self._update_display()
             
         except Exception as e:
@@ -249,25 +267,55 @@ class BrailleToLugandaApp:
             self.last_translation = "Translation error"
             self._update_display()
             
-    def _calculate_remaining_dot_duration(self, dots: List[int]) -> float:
+    def _accept_completion(self):
+        """Replace the word being typed with its top completion and speak it"""
+        completion = self.completions[0]
+        self.current_word = []
+        self.completions = []
+        self.display_text = completion.luganda_word
+        self.last_translation = completion.luganda_word
+        threading.Thread(target=self.audio.speak,
+                         args=(completion.luganda_word, 'lg'), daemon=True).start()
+        self._update_display()
+            
+    def _suggest_corrections(self, braille_word: str):
+        """Show and speak the closest lexicon words if braille_word is not in the lexicon"""
+        try:
+            suggestions = self.engine.suggest_corrections(braille_word, SUGGESTIONS_SHOWN).get(braille_word)
+        except Exception as e:
+            print(f"Suggestion error: {e}")
+            return
+        if not suggestions or self.current_word:
+            return  # known word, or the next word is already being typed
+        self.suggestions = suggestions
+        self._update_display()
+        # speak uses the words' recordings where they exist, TTS otherwise
+        self.audio.speak(' '.join(s.luganda_word for s in suggestions), 'lg')
+
+    def _calculate_remaining_dot_duration(self, cell: Cell) -> float:
         
-        base_duration_per_dot = 0.20 * len(dots)
+        base_duration_per_dot = 0.20 * cell.count
         inter_dot_buffer = 0.10
-        total_duration = (base_duration_per_dot * len(dots)) + inter_dot_buffer
+        total_duration = (base_duration_per_dot * cell.count) + inter_dot_buffer
         
         return min(max(total_duration, 0.5), 1.5)  # Cap at 1 second max delay
             
-    def _play_dot_sound(self, dots: List[int]):
+    def _play_dot_sound(self, cell: Cell):
         """Play TTS announcements for dot presses while maintaining fallbacks"""
+        if not self.audio.ensure_mixer():
+            return
+
         try:
+            from gtts import gTTS
+
             # 1. First stop any existing dot sounds
-            pygame.mixer.stop()  # Stop all sounds except music
+            self.audio.sink.stop()
             
             # Create faster TTS for all dots at once
-            dot_text = " ".join(f"dot {dot}" for dot in sorted(dots))
+            dot_text = " ".join(f"dot {dot}" for dot in cell.dots)
             tts = gTTS(text=dot_text, lang='en', slow=False)
         
-            # Play through pygame mixer Use in-memory audio with faster playback
+            # Play through the audio sink Use in-memory audio with faster playback
             with BytesIO() as fp:
                 tts.write_to_fp(fp)
                 fp.seek(0)
@@ -277,10 +325,7 @@ class BrailleToLugandaApp:
                 sound.set_volume(0.6)
                 
                 # Play with shorter delay
-                channel = sound.play()
-                if channel:
-                    # Fade out quickly if translation starts
-                    channel.set_endevent(pygame.USEREVENT)
+                self.audio.sink.play_sound(sound)
             
             # Short delay to prevent audio cutoff
             pygame.time.delay(300)  # 150ms delay
@@ -289,16 +334,14 @@ class BrailleToLugandaApp:
             print(f"TTS Error: {tts_error}")
             # Fallback to individual dot sounds or beeps
             try:
-                for dot in dots:
+                for dot in cell.dots:
                     try:
-                        sound = pygame.mixer.Sound(f"audio/dot_{dot}.wav")
-                        sound.play()
-                        time.sleep(0.05)
+                        self.audio.sink.play_sound(pygame.mixer.Sound(f"audio/dot_{dot}.wav"))
+                        self.audio.sink.pause(0.05)
                     except:
                         # Final fallback to system beep
-                        beep = pygame.mixer.Sound(buffer=bytearray([80] * 30))
-                        beep.play()
-                        time.sleep(0.05)
+                        self.audio.sink.play_sound(pygame.mixer.Sound(buffer=bytearray([80] * 30)))
+                        self.audio.sink.pause(0.05)
             except Exception as fallback_error:
                 print(f"Fallback audio error: {fallback_error}")
             
@@ -307,6 +350,15 @@ class BrailleToLugandaApp:
         
         if hasattr(self, 'input_handler'):
             self.input_handler.stop()
+            # Replay and the child-process keyboard measure their latency
+            if hasattr(self.input_handler, 'report'):
+                report = self.input_handler.report()
+                print(f"{self.input_method.capitalize()} latency:", ', '.join(
+                    f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                    for key, value in report.items()))
+
+        if hasattr(self, 'audio'):
+            self.audio.close()
             
         # Then pygame
         if pygame.get_init():
@@ -314,15 +366,25 @@ class BrailleToLugandaApp:
     
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Braille to Luganda Translator')
-    parser.add_argument('--input', choices=['keyboard', 'gui', 'physical'],
+    parser.add_argument('--input', choices=list(INPUT_METHODS),
                         default='keyboard', help='Input method')
+    parser.add_argument('--record', metavar='PATH', help='Log input events to a session file')
+    parser.add_argument('--session', metavar='PATH', help='Session file to replay (--input replay)')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Replay pace as a multiple of the recorded one; 0 = as fast as possible')
+    parser.add_argument('--audio-output', metavar='SINK',
+                        help='pygame, null or wav:<path> (default: the audio_output setting)')
     args = parser.parse_args()
+    if args.input == 'replay' and not args.session:
+        parser.error("--input replay needs --session")
+    input_options = {'path': args.session, 'speed': args.replay_speed} if args.input == 'replay' else {}
 
     app = None
     try:
         # Initialize app with error handling
         try:
-            app = BrailleToLugandaApp(input_method=args.input)
+            app = BrailleToLugandaApp(input_method=args.input, input_options=input_options,
+                                      record_path=args.record, audio_output=args.audio_output)
         except pygame.error as e:
             print(f"Failed to initialize Pygame: {e}")
             sys.exit(1)
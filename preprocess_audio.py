@@ -0,0 +1,206 @@
+"""Offline preprocessing of the recorded Luganda audio assets.
+
+Every asset in audio_files/ is decoded and resampled to the mixer's PCM
+format, trimmed of leading and trailing silence, normalized to a common
+loudness and written as WAV to audio_processed/, together with a
+manifest.json of durations and checksums. AudioSystem prefers the
+processed files, so playback does no DSP of its own.
+
+Files are processed in a process pool. The manifest records the checksum
+of each source and the output format, so re-runs only touch assets that
+changed.
+
+    python preprocess_audio.py [--source audio_files] [--output audio_processed] [--workers 4]
+"""
+import argparse
+import hashlib
+import json
+import os
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from audio_system import MIXER_SETTINGS
+
+SOURCE_DIR = Path('audio_files')
+PROCESSED_DIR = Path('audio_processed')
+MANIFEST_NAME = 'manifest.json'
+SOURCE_FORMATS = ('.wav', '.mp3', '.ogg')
+
+# Loudness target (RMS of the trimmed signal) and peak ceiling, in dBFS
+TARGET_RMS_DBFS = -18.0
+PEAK_CEILING_DBFS = -1.0
+# Audio quieter than this, relative to the asset's peak, counts as silence
+SILENCE_DB = -40.0
+# Silence analysis window, and silence kept at each end, in ms
+SILENCE_WINDOW_MS = 10
+KEEP_SILENCE_MS = 20
+
+
+def output_format() -> Dict:
+    """Parameters that, when changed, invalidate every processed file"""
+    return {
+        'rate': MIXER_SETTINGS['frequency'],
+        'channels': MIXER_SETTINGS['channels'],
+        'sample_width': abs(MIXER_SETTINGS['size']) // 8,
+        'target_rms_dbfs': TARGET_RMS_DBFS,
+        'peak_ceiling_dbfs': PEAK_CEILING_DBFS,
+        'silence_db': SILENCE_DB,
+        'keep_silence_ms': KEEP_SILENCE_MS,
+    }
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def trim_silence(samples, sample_rate: int):
+    """samples without leading and trailing silence (KEEP_SILENCE_MS kept)"""
+    import numpy as np
+    window = max(1, sample_rate * SILENCE_WINDOW_MS // 1000)
+    mono = np.abs(samples.astype(np.float32)).max(axis=1)
+    count = len(mono) // window
+    if count == 0:
+        return samples
+    levels = mono[:count * window].reshape(count, window).max(axis=1)
+    peak = levels.max()
+    if peak == 0:
+        return samples[:0]
+    loud = np.flatnonzero(levels >= peak * 10 ** (SILENCE_DB / 20))
+    keep = sample_rate * KEEP_SILENCE_MS // 1000
+    start = max(0, loud[0] * window - keep)
+    end = min(len(samples), (loud[-1] + 1) * window + keep)
+    return samples[start:end]
+
+
+def normalize_loudness(samples) -> Tuple[object, float]:
+    """int16 samples scaled to TARGET_RMS_DBFS without peaks above the ceiling; returns (samples, gain_db)"""
+    import numpy as np
+    x = samples.astype(np.float32) / 32768.0
+    if not len(x):
+        return samples, 0.0
+    rms = float(np.sqrt(np.mean(x * x)))
+    peak = float(np.abs(x).max())
+    if rms == 0:
+        return samples, 0.0
+    gain = min(10 ** (TARGET_RMS_DBFS / 20) / rms, 10 ** (PEAK_CEILING_DBFS / 20) / peak)
+    scaled = np.clip(np.rint(x * gain * 32768.0), -32768, 32767).astype(np.int16)
+    return scaled, 20 * float(np.log10(gain))
+
+
+def write_wav(path: Path, samples, sample_rate: int):
+    with wave.open(str(path), 'wb') as out:
+        out.setnchannels(samples.shape[1])
+        out.setsampwidth(samples.dtype.itemsize)
+        out.setframerate(sample_rate)
+        out.writeframes(samples.tobytes())
+
+
+def _init_worker():
+    # Decoding needs the mixer but never a sound card
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+    pygame.mixer.init(**MIXER_SETTINGS)
+
+
+def process_file(source: Path, output: Path) -> Dict:
+    """Decode, trim and normalize one asset into output (runs in a worker)"""
+    import pygame
+    sample_rate = pygame.mixer.get_init()[0]
+    samples = pygame.sndarray.array(pygame.mixer.Sound(str(source)))
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    original = len(samples)
+    samples, gain_db = normalize_loudness(trim_silence(samples, sample_rate))
+
+    tmp_path = output.with_suffix('.wav.tmp')
+    write_wav(tmp_path, samples, sample_rate)
+    os.replace(tmp_path, output)
+    return {
+        'output': output.name,
+        'duration': round(len(samples) / sample_rate, 4),
+        'trimmed': round((original - len(samples)) / sample_rate, 4),
+        'gain_db': round(gain_db, 2),
+        'sha256': file_sha256(output),
+    }
+
+
+def load_manifest(output_dir: Path) -> Dict:
+    try:
+        with open(output_dir / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def preprocess(source_dir: Path = SOURCE_DIR, output_dir: Path = PROCESSED_DIR,
+               workers: Optional[int] = None, force: bool = False) -> Dict[str, int]:
+    """Process every changed asset; returns counts of processed, skipped and removed files"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    fmt = output_format()
+    # Everything the last run wrote, whatever its format; only reused if
+    # the format is unchanged
+    recorded = manifest.get('files', {})
+    previous = recorded if manifest.get('format') == fmt and not force else {}
+
+    # One output per asset name; if several formats exist the first in name order wins
+    sources = {}
+    for path in sorted(source_dir.iterdir()):
+        if path.suffix.lower() in SOURCE_FORMATS:
+            sources.setdefault(path.stem.lower(), path)
+
+    files, pending = {}, []
+    for name, source in sources.items():
+        checksum = file_sha256(source)
+        entry = previous.get(name)
+        if (entry and entry['source'] == source.name and entry['source_sha256'] == checksum
+                and (output_dir / entry['output']).exists()):
+            files[name] = entry
+        else:
+            pending.append((name, source, checksum))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [
+                (name, source, checksum, pool.submit(process_file, source, output_dir / f"{name}.wav"))
+                for name, source, checksum in pending
+            ]
+            for name, source, checksum, future in futures:
+                try:
+                    files[name] = dict(source=source.name, source_sha256=checksum, **future.result())
+                except Exception as e:
+                    print(f"Failed to process {source}: {e}")
+
+    # Outputs whose source is gone, or that were written under another name
+    removed = 0
+    for name, entry in recorded.items():
+        if name not in sources or (name in files and files[name]['output'] != entry['output']):
+            (output_dir / entry['output']).unlink(missing_ok=True)
+            removed += 1
+
+    manifest = {'format': fmt, 'files': dict(sorted(files.items()))}
+    tmp_path = output_dir / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_dir / MANIFEST_NAME)
+    return {'processed': len(files) - (len(sources) - len(pending)),
+            'skipped': len(sources) - len(pending), 'removed': removed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Transcode, trim and normalize the audio assets')
+    parser.add_argument('--source', type=Path, default=SOURCE_DIR, help='Recorded assets')
+    parser.add_argument('--output', type=Path, default=PROCESSED_DIR, help='Processed WAV files and manifest')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Reprocess unchanged files too')
+    args = parser.parse_args()
+
+    counts = preprocess(args.source, args.output, args.workers, args.force)
+    print(f"Processed {counts['processed']}, skipped {counts['skipped']} unchanged, "
+          f"removed {counts['removed']} stale assets in {args.output}")
@@ -0,0 +1,93 @@
+"""User settings from the user_settings table, read once and cached.
+
+Settings are loaded when UserSettings is created and served from memory
+afterwards. Components that depend on a setting subscribe to changes
+instead of querying the database on every use.
+"""
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Callable, Dict, List, Optional
+
+# Named speech_speed values and their playback rates; numeric values such
+# as '1.75' are also accepted
+SPEECH_SPEEDS = {'slow': 0.75, 'normal': 1.0, 'fast': 1.5, 'very_fast': 2.0}
+MIN_SPEECH_RATE = 0.5
+MAX_SPEECH_RATE = 3.0
+
+
+def parse_speech_rate(value: Optional[str]) -> float:
+    """Playback rate for a speech_speed value; 1.0 if it is not understood"""
+    if value is None:
+        return 1.0
+    value = value.strip().lower()
+    if value in SPEECH_SPEEDS:
+        return SPEECH_SPEEDS[value]
+    try:
+        rate = float(value.rstrip('x'))
+    except ValueError:
+        return 1.0
+    return min(max(rate, MIN_SPEECH_RATE), MAX_SPEECH_RATE)
+
+
+class UserSettings:
+    def __init__(self, db_path: str = 'braille_luganda.db'):
+        self.db_path = db_path
+        self._values: Dict[str, str] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def reload(self):
+        """Re-read all settings, notifying listeners of values that changed"""
+        with closing(self._connect()) as conn:
+            try:
+                rows = conn.execute('SELECT setting_name, setting_value FROM user_settings').fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+        with self._lock:
+            old, self._values = self._values, dict(rows)
+        for name, value in self._values.items():
+            if old and old.get(name) != value:
+                self._notify(name, value)
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._values.get(name, default)
+
+    def set(self, name: str, value: str):
+        """Store a setting and notify listeners if it changed"""
+        value = str(value)
+        if self._values.get(name) == value:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT INTO user_settings (setting_name, setting_value) VALUES (?, ?) '
+                'ON CONFLICT(setting_name) DO UPDATE SET setting_value = excluded.setting_value',
+                (name, value)
+            )
+        with self._lock:
+            self._values[name] = value
+        self._notify(name, value)
+
+    def subscribe(self, listener: Callable[[str, str], None]):
+        """Call listener(name, value) whenever a setting changes"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, str], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, name: str, value: str):
+        for listener in list(self._listeners):
+            try:
+                listener(name, value)
+            except Exception as e:
+                print(f"Settings listener error for {name}: {e}")
+
+    @property
+    def speech_rate(self) -> float:
+        """Playback rate from speech_speed"""
+        return parse_speech_rate(self.get('speech_speed'))
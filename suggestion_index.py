@@ -0,0 +1,165 @@
+"""Correction suggestions for mis-dotted Braille words.
+
+A 6-dot cell is a 6-bit mask, so a Braille word of n cells is a 6n-bit
+string and a wrongly pressed or missed dot is one flipped bit. Lexicon
+patterns of the same length within a small Hamming distance (total dots
+that differ) are the likely intended words.
+
+The index uses multi-index hashing: each pattern's bits are split into
+max_distance + 1 blocks, and by the pigeonhole principle any pattern within
+max_distance of a query agrees with it exactly on at least one block. A
+query therefore looks up max_distance + 1 buckets and only checks the
+distance (one XOR and popcount) of the patterns in them, instead of
+scanning the lexicon.
+
+Short patterns share their blocks with too many others for that to pay
+off, so they are not put in buckets; a query for one probes every pattern
+within max_distance of it directly (SymSpell-style neighbour generation).
+
+    index = SuggestionIndex()
+    index.update(conn.execute('SELECT braille_pattern, luganda_word FROM common_words'))
+    index.suggest('⠁⠃⠁⠝⠞⠧')  # [Suggestion('⠁⠃⠁⠝⠞⠥', 'abantu', 1), ...]
+"""
+from itertools import combinations
+from math import comb
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+BRAILLE_BASE = 0x2800
+# Largest supported distance; each extra dot adds a bucket to every query
+MAX_DISTANCE = 2
+# Bits of a bucket key below the block value: pattern length and block number
+_LENGTH_BITS = 16
+_BLOCK_BITS = 2
+# Patterns short enough to have at most this many neighbours within
+# max_distance are looked up by probing the neighbours
+NEIGHBOUR_PROBE_LIMIT = 512
+
+
+class Suggestion(NamedTuple):
+    braille_pattern: str
+    luganda_word: str
+    distance: int  # dots that differ from the query
+
+
+def pattern_code(braille_pattern: str) -> Optional[int]:
+    """Cells of a Unicode Braille pattern packed into an int (cell i at bits 6i..6i+5)
+
+    A marker bit above the last cell keeps patterns of different lengths
+    distinct; dots 7 and 8 are ignored. None if the pattern has anything
+    but Braille cells.
+    """
+    code = 0
+    for char in reversed(braille_pattern):
+        cell = ord(char) - BRAILLE_BASE
+        if not 0 <= cell < 256:
+            return None
+        code = code << 6 | (cell & 0x3F)
+    return code | 1 << (6 * len(braille_pattern)) if braille_pattern else None
+
+
+def code_pattern(code: int) -> str:
+    """Inverse of pattern_code"""
+    cells = (code.bit_length() - 1) // 6
+    return ''.join(chr(BRAILLE_BASE + (code >> (6 * i) & 0x3F)) for i in range(cells))
+
+
+class SuggestionIndex:
+    def __init__(self, max_distance: int = MAX_DISTANCE):
+        if not 0 <= max_distance < 1 << _BLOCK_BITS:
+            raise ValueError(f"max_distance must be between 0 and {(1 << _BLOCK_BITS) - 1}")
+        self.max_distance = max_distance
+        # Pattern code -> Luganda word
+        self.words: Dict[int, str] = {}
+        # Bucket key -> pattern code, or a list of codes once shared; most
+        # buckets of a large lexicon hold one pattern
+        self.buckets: Dict[int, Union[int, List[int]]] = {}
+        # Patterns of up to probe_cells cells are probed instead of bucketed
+        self.probe_cells = 0
+        while (self.probe_cells < 1 << _LENGTH_BITS and NEIGHBOUR_PROBE_LIMIT >= sum(
+                comb(6 * (self.probe_cells + 1), d) for d in range(max_distance + 1))):
+            self.probe_cells += 1
+        self._flip_masks: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _keys(self, code: int) -> List[int]:
+        """Bucket keys of a pattern: each block's bits with the length and block number"""
+        cells = (code.bit_length() - 1) // 6
+        bits, blocks = 6 * cells, self.max_distance + 1
+        keys = []
+        for block in range(blocks):
+            low, high = bits * block // blocks, bits * (block + 1) // blocks
+            value = code >> low & ((1 << (high - low)) - 1)
+            keys.append(((value << _LENGTH_BITS | cells) << _BLOCK_BITS) | block)
+        return keys
+
+    def _flips(self, cells: int) -> List[int]:
+        """XOR masks of every change of up to max_distance dots in a pattern of cells cells"""
+        masks = self._flip_masks.get(cells)
+        if masks is None:
+            bits = [1 << bit for bit in range(6 * cells)]
+            masks = [sum(flipped) for distance in range(self.max_distance + 1)
+                     for flipped in combinations(bits, distance)]
+            self._flip_masks[cells] = masks
+        return masks
+
+    def add(self, braille_pattern: str, luganda_word: str):
+        """Add or replace a lexicon entry; patterns that are not pure Braille are ignored"""
+        code = pattern_code(braille_pattern)
+        if code is None or (code.bit_length() - 1) // 6 >= 1 << _LENGTH_BITS:
+            return
+        known = code in self.words
+        self.words[code] = luganda_word
+        if known or (code.bit_length() - 1) // 6 <= self.probe_cells:
+            return
+        buckets = self.buckets
+        for key in self._keys(code):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = code
+            elif isinstance(bucket, int):
+                buckets[key] = [bucket, code]
+            else:
+                bucket.append(code)
+
+    def update(self, entries: Iterable[Tuple[str, str]]):
+        for braille_pattern, luganda_word in entries:
+            self.add(braille_pattern, luganda_word)
+
+    def suggest(self, braille_word: str, limit: int = 5,
+                max_distance: Optional[int] = None) -> List[Suggestion]:
+        """Up to limit entries within max_distance dots of braille_word, closest first
+
+        An exact match is returned with distance 0. max_distance is capped
+        at the index's own.
+        """
+        code = pattern_code(braille_word)
+        if code is None or limit <= 0:
+            return []
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        words = self.words
+        found: Dict[int, int] = {}
+        cells = (code.bit_length() - 1) // 6
+        if cells <= self.probe_cells:
+            for flip in self._flips(cells):
+                if code ^ flip in words:
+                    found[code ^ flip] = flip.bit_count()
+        else:
+            buckets = self.buckets
+            for key in self._keys(code):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    continue
+                for candidate in ((bucket,) if isinstance(bucket, int) else bucket):
+                    if candidate not in found:
+                        found[candidate] = (code ^ candidate).bit_count()
+
+        matches = sorted(
+            (distance, words[candidate], candidate)
+            for candidate, distance in found.items() if distance <= max_distance
+        )
+        return [Suggestion(code_pattern(candidate), word, distance)
+                for distance, word, candidate in matches[:limit]]
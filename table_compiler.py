@@ -0,0 +1,239 @@
+"""Compiler for Braille translation tables (tables/*.ctb).
+
+A table lists letters, digraphs, indicators (capital and number signs),
+multi-cell contractions and extra pronunciations, in a line format similar
+in spirit to liblouis tables; tables/luganda.ctb documents the opcodes.
+
+Compiling a table produces:
+
+    cell_text, cell_ipa   output for every single cell (64 entries), used
+                          where no rule spans more than one cell
+    transitions, actions  a deterministic state machine over cell masks
+                          holding every multi-cell rule, whole-word rule and
+                          indicator, matched longest-first
+    digits                cell mask -> digit, used after a number sign
+
+TranslationEngine translates plain cells with the single-cell tables and
+runs the state machine only on words that contain a cell starting one of
+its rules, so adding rules does not slow down ordinary text.
+
+Compiled tables are cached on disk under the SHA-256 of the table text,
+so each table is compiled once.
+
+    python table_compiler.py [tables/luganda.ctb]
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import shlex
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+TABLES_DIR = Path(__file__).resolve().parent / 'tables'
+DEFAULT_TABLE = TABLES_DIR / 'luganda.ctb'
+CACHE_DIR_NAME = '.cache'
+# Bump when the compiled layout changes so cached tables are rebuilt
+COMPILER_VERSION = 1
+
+# State machine actions: (kind, text, ipa, whole_word)
+TEXT = 'text'
+CAPITAL = 'capital'
+NUMBER = 'number'
+Action = Tuple[str, str, str, bool]
+
+DIGIT_LETTERS = 'abcdefghij'
+DIGITS = '1234567890'
+
+
+class TableError(ValueError):
+    """A syntax or consistency error in a translation table"""
+
+
+def parse_dots(spec: str) -> Tuple[int, ...]:
+    """'1345-146' -> cell masks (bit 0 = dot 1 ... bit 5 = dot 6)"""
+    masks = []
+    for cell in spec.split('-'):
+        if not cell or any(c not in '123456' for c in cell):
+            raise ValueError(f"invalid dots {spec!r}")
+        mask = 0
+        for dot in cell:
+            mask |= 1 << (int(dot) - 1)
+        masks.append(mask)
+    return tuple(masks)
+
+
+def mask_to_dots(mask: int) -> Tuple[int, ...]:
+    return tuple(dot for dot in range(1, 7) if mask & (1 << (dot - 1)))
+
+
+def spell_ipa(text: str, phonetics: Dict[str, str]) -> str:
+    """IPA for a letter sequence, greedily using the longest known units"""
+    longest = max(map(len, phonetics), default=1)
+    result, i = [], 0
+    while i < len(text):
+        for length in range(min(longest, len(text) - i), 0, -1):
+            unit = text[i:i + length]
+            if unit in phonetics:
+                result.append(phonetics[unit])
+                i += length
+                break
+        else:
+            result.append(text[i])
+            i += 1
+    return ''.join(result)
+
+
+class CompiledTable:
+    def __init__(self, digest: str, source: str):
+        self.digest = digest
+        self.source = source
+        # (mask, letters, ipa, description) for every single-cell rule
+        self.letters: List[Tuple[int, str, str, str]] = []
+        self.cell_text: List[str] = [''] + ['?'] * 63
+        self.cell_ipa: List[str] = [''] + ['?'] * 63
+        self.phonetics: Dict[str, str] = {'?': '?'}
+        self.transitions: List[Dict[int, int]] = [{}]
+        self.actions: List[Optional[Action]] = [None]
+        self.digits: Dict[int, str] = {}
+
+    @property
+    def start_cells(self) -> List[int]:
+        """Masks of cells that can start a state-machine match"""
+        return sorted(self.transitions[0])
+
+    @property
+    def braille_map(self) -> Dict[Tuple[int, ...], str]:
+        """Single-cell rules as {dots: letters}, the TranslationEngine.braille_map form"""
+        return {mask_to_dots(mask): text for mask, text, _, _ in self.letters}
+
+    def _add_sequence(self, masks: Tuple[int, ...], action: Action):
+        state = 0
+        for mask in masks:
+            following = self.transitions[state].get(mask)
+            if following is None:
+                following = len(self.transitions)
+                self.transitions[state][mask] = following
+                self.transitions.append({})
+                self.actions.append(None)
+            state = following
+        self.actions[state] = action
+
+
+def table_digest(text: str) -> str:
+    """Cache key of a table: its text and the compiler version"""
+    return hashlib.sha256(f"{COMPILER_VERSION}\0{text}".encode('utf-8')).hexdigest()
+
+
+def compile_table(text: str, source: str = '<table>') -> CompiledTable:
+    """Compile table text into a CompiledTable"""
+    table = CompiledTable(table_digest(text), source)
+    sequences: List[Tuple[Tuple[int, ...], str, bool, int]] = []
+
+    for number, line in enumerate(text.splitlines(), 1):
+        try:
+            fields = shlex.split(line, comments=True)
+        except ValueError as e:
+            raise TableError(f"{source}:{number}: {e}")
+        if not fields:
+            continue
+        opcode, args = fields[0], fields[1:]
+        try:
+            if opcode in ('letter', 'digraph'):
+                if len(args) < 3:
+                    raise ValueError(f"expected: {opcode} <chars> <dots> <ipa> [description]")
+                chars, masks, ipa = args[0], parse_dots(args[1]), args[2]
+                if len(masks) != 1:
+                    raise ValueError(f"{opcode} must be a single cell")
+                if opcode == 'letter' and len(chars) != 1:
+                    raise ValueError("letter must be one character; use digraph")
+                description = args[3] if len(args) > 3 else ''
+                table.letters.append((masks[0], chars, ipa, description))
+                table.cell_text[masks[0]] = chars
+                table.cell_ipa[masks[0]] = ipa
+                table.phonetics[chars] = ipa
+            elif opcode in ('contraction', 'word'):
+                if len(args) != 2:
+                    raise ValueError(f"expected: {opcode} <chars> <dots-dots...>")
+                masks = parse_dots(args[1])
+                if opcode == 'contraction' and len(masks) < 2:
+                    raise ValueError("a contraction needs at least two cells")
+                sequences.append((masks, args[0], opcode == 'word', number))
+            elif opcode in ('capsign', 'numsign'):
+                if len(args) != 1:
+                    raise ValueError(f"expected: {opcode} <dots>")
+                masks = parse_dots(args[0])
+                table._add_sequence(masks, (CAPITAL if opcode == 'capsign' else NUMBER, '', '', False))
+            elif opcode == 'phonetic':
+                if len(args) != 2:
+                    raise ValueError("expected: phonetic <chars> <ipa>")
+                table.phonetics[args[0]] = args[1]
+            else:
+                raise ValueError(f"unknown opcode {opcode!r}")
+        except ValueError as e:
+            raise TableError(f"{source}:{number}: {e}")
+
+    # Contractions are added once all pronunciations are known
+    for masks, chars, whole_word, number in sequences:
+        state = 0
+        for mask in masks:
+            state = table.transitions[state].get(mask, -1)
+            if state < 0:
+                break
+        if state > 0 and table.actions[state] is not None and table.actions[state][0] != TEXT:
+            raise TableError(f"{source}:{number}: {chars!r} uses the cells of an indicator")
+        table._add_sequence(masks, (TEXT, chars, spell_ipa(chars, table.phonetics), whole_word))
+
+    by_letter = {chars: mask for mask, chars, _, _ in table.letters}
+    table.digits = {by_letter[letter]: digit for letter, digit in zip(DIGIT_LETTERS, DIGITS)
+                    if letter in by_letter}
+    return table
+
+
+def cache_path(path: Path, digest: str, cache_dir: Optional[Path] = None) -> Path:
+    return (cache_dir or path.parent / CACHE_DIR_NAME) / f"{path.stem}-{digest[:16]}.pickle"
+
+
+def load_table(path: Union[str, Path] = DEFAULT_TABLE, cache_dir: Optional[Path] = None) -> CompiledTable:
+    """Compiled form of the table at path, from the on-disk cache when possible"""
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    digest = table_digest(text)
+    cached = cache_path(path, digest, cache_dir)
+    # Cached as a plain dict, so the file does not depend on how this
+    # module was imported
+    try:
+        with open(cached, 'rb') as f:
+            data = pickle.load(f)
+        if isinstance(data, dict) and data.get('digest') == digest:
+            table = CompiledTable.__new__(CompiledTable)
+            table.__dict__.update(data)
+            return table
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+
+    table = compile_table(text, str(path))
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cached.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(vars(table), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cached)
+    except OSError as e:
+        # A read-only install still works, it just compiles on every start
+        print(f"Could not cache compiled table {cached}: {e}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compile a Braille translation table')
+    parser.add_argument('table', nargs='?', default=str(DEFAULT_TABLE))
+    args = parser.parse_args()
+
+    try:
+        compiled = load_table(args.table)
+    except TableError as e:
+        raise SystemExit(f"Table error: {e}")
+    print(f"{args.table}: {len(compiled.letters)} single-cell rules, "
+          f"{len(compiled.transitions) - 1} state machine states, "
+          f"{len(compiled.start_cells)} start cells, digest {compiled.digest[:16]}")
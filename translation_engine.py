@@ -1,155 +1,297 @@
-from braille_processor import BrailleProcessor
-from typing import List, Tuple
 import re
 from pathlib import Path
+from braille_cell import Cell
+from braille_processor import BrailleProcessor
+from completion_trie import Completion
+from suggestion_index import Suggestion
+from table_compiler import CAPITAL, DEFAULT_TABLE, NUMBER, load_table
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+# Cell bytes: a byte stream where 0x80 | mask is a 6-dot Braille cell
+# (mask bit 0 = dot 1 ... bit 5 = dot 6), 0xC0-0xFF is a cell that cannot
+# be represented (8-dot or invalid input) and bytes below 0x80 are ASCII.
+# BRF and UTF-8 Braille files are converted to this form with bytes.translate
+# so they can be translated without ever being decoded to str.
+CELL_BASE = 0x80
+UNKNOWN_CELL = 0xC0
+# Whitespace passed through translate_cells; all other ASCII is dropped,
+# like non-Braille characters in _translate_text
+CELL_WHITESPACE = b' \t\n\f\r'
+# Control bytes used as stand-ins for multi-byte outputs (e.g. 'ny')
+_PLACEHOLDERS = bytes(b for b in range(1, 32) if b not in CELL_WHITESPACE)
+_WORD_END = re.compile(b'[' + re.escape(CELL_WHITESPACE) + b']')
+
+# Unicode Braille as cell bytes (latin-1 characters); cells with dot 7 or 8
+# raised are not in the 6-dot table and become UNKNOWN_CELL ('?')
+_UNICODE_TO_CELLS = {0x2800 + code: CELL_BASE | code if code <= 0x3F else UNKNOWN_CELL
+                     for code in range(256)}
+_UNKNOWN_OUTPUT = ('?', '?')
+# Characters translate() ignores: everything but Braille and the space
+_NON_BRAILLE = re.compile('[^\u2800-\u28ff ]+')
+
+
+def compile_cell_table(outputs: List[str]) -> Tuple[bytes, bytes, List[Tuple[bytes, bytes]]]:
+    """Compile the 64 per-mask output strings into bytes.translate arguments
+
+    Returns (table, delete, expansions). Masks whose output is a single ASCII
+    byte translate directly; longer outputs translate to a placeholder byte
+    that is expanded afterwards with bytes.replace.
+    """
+    table = bytearray(range(256))
+    expansions = []
+    for mask, text in enumerate(outputs):
+        encoded = text.encode('utf-8')
+        if len(encoded) == 1 and encoded[0] < 0x80:
+            table[CELL_BASE | mask] = encoded[0]
+        else:
+            placeholder = bytes([_PLACEHOLDERS[len(expansions)]])
+            table[CELL_BASE | mask] = placeholder[0]
+            expansions.append((placeholder, encoded))
+    table[UNKNOWN_CELL:] = b'?' * (256 - UNKNOWN_CELL)
+    delete = bytes(b for b in range(CELL_BASE) if b not in CELL_WHITESPACE)
+    return bytes(table), delete, expansions
+
+
+class CharacterInfo(NamedTuple):
+    """One Braille character of an analyzed word"""
+    braille_code: str
+    luganda_char: str
+    ipa_pronunciation: Optional[str]
+    description: str
+
+
+class WordAnalysis(NamedTuple):
+    """Result of analyze_words for one Braille word"""
+    braille_pattern: str
+    luganda_word: str
+    known: bool  # found in common_words
+    english_meaning: Optional[str]
+    category: Optional[str]
+    characters: Tuple[CharacterInfo, ...]
+
+    def as_dict(self) -> dict:
+        """JSON-ready form, with the breakdown as a list of dicts"""
+        result = self._asdict()
+        result['character_breakdown'] = [char._asdict() for char in result.pop('characters')]
+        return result
 
 
 class TranslationEngine:
-    def __init__(self):
-        self.processor = BrailleProcessor()
-        self.braille_map = {
-            # English letters
-            (1,): 'a', (1,2): 'b', (1,4): 'c',
-            (1,4,5): 'd', (1,5): 'e', (1,2,4): 'f',
-            (1,2,4,5): 'g', (1,2,5): 'h', (2,4): 'i',
-            (2,4,5): 'j', (1,3): 'k', (1,2,3): 'l',
-            (1,3,4): 'm', (1,3,4,5): 'n', (1,3,5): 'o',
-            (1,2,3,4): 'p', (1,2,3,4,5): 'q', (1,2,3,5): 'r',
-            (2,3,4): 's', (2,3,4,5): 't', (1,3,6): 'u',
-            (1,2,3,6): 'v', (2,4,5,6): 'w', (1,3,4,6): 'x',
-            (1,3,4,5,6): 'y', (1,3,5,6): 'z',
-            
-            # Luganda special characters
-            (1,4,6): 'ny', (1,2,4,6): 'ng',
-            (1,5,6): 'gw', (2,4,6): 'ky',
-            (1,2,5,6): 'ly'
-        }
+    def __init__(self, db_path: str = 'braille_luganda.db', read_only: bool = False,
+                 memory_path: Optional[str] = None, table_path: Union[str, Path] = DEFAULT_TABLE):
+        self.processor = BrailleProcessor(db_path, read_only=read_only)
+        # Letters, digraphs, indicators and contractions come from the
+        # translation table (see table_compiler.py)
+        self.table = load_table(table_path)
+        self.braille_map = self.table.braille_map
+        # (Luganda, IPA) of every cell mask: the 64-slot table chords are
+        # translated with
+        self.cell_outputs: Tuple[Tuple[str, str], ...] = tuple(zip(self.table.cell_text, self.table.cell_ipa))
+        starts = bytes(CELL_BASE | mask for mask in self.table.start_cells)
+        # Cells after which the table's state machine has to run
+        self._special_re = re.compile(b'[' + re.escape(starts) + b']') if starts else None
+        self._cell_tables: Dict[bool, tuple] = {}
+
+        # Optional persistent translation memory for text input
+        self.memory = None
+        if memory_path:
+            from translation_memory import TranslationMemory
+            self.memory = TranslationMemory(memory_path, version_source=self._memory_version)
+
+    def _memory_version(self) -> str:
+        # Cached translations depend on both the lexicon and the table
+        return f"{self.processor.check_lexicon_version()}:{self.table.digest[:16]}"
 
     def _get_phonetic(self, char: str) -> str:
         """Get IPA phonetic representation"""
-        phonetics = {
-            # Vowels
-        'a': 'a', 'e': 'e', 'i': 'i', 'o': 'o', 'u': 'u',
-        
-        # Consonants
-        'b': 'b', 'c': 'tʃ', 'd': 'd', 'f': 'f', 'g': 'ɡ',
-        'h': 'h', 'j': 'dʒ', 'k': 'k', 'l': 'l', 'm': 'm',
-        'n': 'n', 'p': 'p', 'r': 'r', 's': 's', 't': 't',
-        'v': 'v', 'w': 'w', 'y': 'j', 'z': 'z',
-        
-        # Luganda digraphs
-        'ny': 'ɲ', 'ng': 'ŋ', 'gw': 'ɡʷ',
-        'ky': 'c', 'ly': 'ʎ', 'mp': 'mp',
-        'nt': 'nt', 'nk': 'ŋk', 'gy': 'ɟ',
-        'i' : 'yi',
-        
-        # Special cases
-        'ng\'': 'ŋ',  # For words like ng'ombe
-        'n\'': 'ŋ',   # Alternate nasal representation
-        '?': '?'      # Unknown character
-    }
-        return phonetics.get(char.lower(), char)
+        return self.table.phonetics.get(char.lower(), char)
         
     def translate(self, input_data) -> tuple:
-        """Handle both string and list inputs"""
+        """Handle string, Cell (mask) and list-of-dots inputs"""
         if isinstance(input_data, str):
+            if self.memory is not None:
+                return self.memory.translate(input_data, self._translate_text)
             return self._translate_text(input_data)
+        elif isinstance(input_data, int):
+            return self.translate_cell(input_data)
         elif isinstance(input_data, list):
             return self._translate_dots(input_data)
         else:
-            raise ValueError("Input must be string or list of dots")
+            raise ValueError("Input must be a string, a cell mask or a list of dots")
+
+    def translate_cell(self, cell: int) -> Tuple[str, str]:
+        """(Luganda, IPA) of one cell mask; no allocation, for per-keystroke use
+
+        Masks with dot 7 or 8 (or outside 0-255) are unknown, as in text.
+        """
+        if not 0 <= cell <= 0x3F:
+            return _UNKNOWN_OUTPUT
+        return self.cell_outputs[cell]
 
     def _translate_text(self, braille_text: str) -> tuple:
         """Convert Braille text string to Luganda"""
-        luganda_words = []
-        phonetic_words = []
-        
-        for braille_word in braille_text.split(' '):
-            luganda_chars = []
-            phonetic_chars = []
-            
-            for braille_char in self._split_braille_chars(braille_word):
-                dots = self._get_dots_from_braille_char(braille_char)
-                if dots:
-                    dot_tuple = tuple(sorted(dots))
-                    luganda = self.braille_map.get(dot_tuple, '?')
-                    luganda_chars.append(luganda)
-                    phonetic_chars.append(self._get_phonetic(luganda))
-            
-            luganda_words.append(''.join(luganda_chars))
-            phonetic_words.append(''.join(phonetic_chars))
-        
-        return ' '.join(luganda_words), ' '.join(phonetic_words)
+        cells = _NON_BRAILLE.sub('', braille_text).translate(_UNICODE_TO_CELLS).encode('latin-1')
+        return (self.translate_cells(cells).decode('utf-8'),
+                self.translate_cells(cells, phonetic=True).decode('utf-8'))
 
     def _translate_dots(self, dots_list: list) -> tuple:
-        """Convert list of dots to Luganda"""
-        dot_tuple = tuple(sorted(dots_list))
-        luganda = self.braille_map.get(dot_tuple, '?')
-        return [luganda], [self._get_phonetic(luganda)]
-    
-    def _split_braille_chars(self, braille_word: str) -> list:
-        """Split a Braille word into individual characters"""
-        #Braille characters are Unicode characters in the range U+2800 to U+28FF
-        return [c for c in braille_word if '\u2800' <= c <= '\u28FF']
-
-    def _get_dots_from_braille_char(self, braille_char: str) -> list:
-        """Convert a Braille Unicode character to its dot pattern"""
-        # The Unicode Braille pattern is determined by the bits representing dots
-        # Each dot position corresponds to a bit in the Unicode value
-        code = ord(braille_char) - 0x2800
-        dots = []
-    
-        # Braille dot numbering:
-        # 1 4
-        # 2 5
-        # 3 6
-        # 7 8 (though standard Braille only uses 1-6)
-    
-        if code & 0x01: dots.append(1)  # Dot 1
-        if code & 0x02: dots.append(2)  # Dot 2
-        if code & 0x04: dots.append(3)  # Dot 3
-        if code & 0x08: dots.append(4)  # Dot 4
-        if code & 0x10: dots.append(5)  # Dot 5
-        if code & 0x20: dots.append(6)  # Dot 6
-    
-        return dots
+        """Convert list of dots to Luganda (the older list form of translate_cell)"""
+        cell = Cell.from_dots(dots_list)
+        luganda, ipa = self.cell_outputs[cell] if cell else ('?', '?')
+        return [luganda], [ipa]
     
+    def _cell_table(self, phonetic: bool) -> tuple:
+        """Compiled cell-byte table for Luganda (or IPA) output"""
+        if phonetic not in self._cell_tables:
+            outputs = self.table.cell_ipa if phonetic else self.table.cell_text
+            self._cell_tables[phonetic] = compile_cell_table(outputs)
+        return self._cell_tables[phonetic]
+
+    def _translate_plain_cells(self, cells: bytes, phonetic: bool) -> bytes:
+        table, delete, expansions = self._cell_table(phonetic)
+        result = cells.translate(table, delete)
+        for placeholder, text in expansions:
+            if placeholder in result:
+                result = result.replace(placeholder, text)
+        return result
+
+    def translate_cells(self, cells: bytes, phonetic: bool = False) -> bytes:
+        """Translate a cell-byte stream to UTF-8 Luganda (or IPA) bytes
+
+        Words containing an indicator or the first cell of a contraction go
+        through the table's state machine; everything else is translated
+        cell by cell with bytes.translate.
+        """
+        if self._special_re is None or not self._special_re.search(cells):
+            return self._translate_plain_cells(cells, phonetic)
+
+        pieces, pos = [], 0
+        for match in self._special_re.finditer(cells):
+            if match.start() < pos:
+                continue  # in a word already translated
+            start = match.start()
+            while start > pos and cells[start - 1] not in CELL_WHITESPACE:
+                start -= 1
+            word_end = _WORD_END.search(cells, match.end())
+            end = word_end.start() if word_end else len(cells)
+            pieces.append(self._translate_plain_cells(cells[pos:start], phonetic))
+            pieces.append(self._translate_word(cells[start:end], phonetic).encode('utf-8'))
+            pos = end
+        pieces.append(self._translate_plain_cells(cells[pos:], phonetic))
+        return b''.join(pieces)
+
+    def _translate_word(self, word: bytes, phonetic: bool) -> str:
+        """Run the table's state machine over one word of cell bytes"""
+        transitions, actions = self.table.transitions, self.table.actions
+        digits = self.table.digits
+        cell_output = self.table.cell_ipa if phonetic else self.table.cell_text
+        out = []
+        capital = 0          # 1: capitalize the next letter, 2: the rest of the word
+        number = False
+        letters_start = 0    # first cell after the word's leading indicators
+        i, n = 0, len(word)
+        while i < n:
+            byte = word[i]
+            if byte < CELL_BASE:
+                i += 1  # stray ASCII is dropped, as in _translate_plain_cells
+                continue
+            if byte >= UNKNOWN_CELL:
+                out.append('?')
+                number = False
+                i += 1
+                continue
+            mask = byte & 0x3F
+            if number:
+                digit = digits.get(mask)
+                if digit is not None:
+                    out.append(digit)
+                    i += 1
+                    continue
+                number = False
+
+            # Longest match; whole-word rules only match the entire word
+            match, end = None, i + 1
+            state, k = transitions[0].get(mask), i
+            while state is not None:
+                k += 1
+                action = actions[state]
+                if action is not None and not (action[3] and (i != letters_start or k != n)):
+                    match, end = action, k
+                if k == n or not CELL_BASE <= word[k] < UNKNOWN_CELL:
+                    break
+                state = transitions[state].get(word[k] & 0x3F)
+
+            if match is not None and match[0] in (CAPITAL, NUMBER):
+                if match[0] == CAPITAL:
+                    capital = 2 if capital else 1
+                else:
+                    number = True
+                if i == letters_start:
+                    letters_start = end
+                i = end
+                continue
+
+            text = cell_output[mask] if match is None else match[2 if phonetic else 1]
+            if capital and not phonetic:
+                text = text.upper() if capital == 2 else text[:1].upper() + text[1:]
+            if capital == 1:
+                capital = 0
+            out.append(text)
+            i = end
+        return ''.join(out)
     
-    def get_word_details(self, braille_word: str) -> dict:
-        """Get detailed information about a Braille word"""
-        # Check if it's a known common word
-        cursor = self.processor.conn.cursor()
-        
-        cursor.execute (
-            ''' SELECT * FROM common_words WHERE braille_pattern = ?''',
-            (braille_word,)
+    def analyze_words(self, braille_words: Iterable[str]) -> List[WordAnalysis]:
+        """Analyze many Braille words with one common_words and one braille_patterns query"""
+        braille_words = list(braille_words)
+        entries = self.processor.get_word_entries(braille_words)
+        mappings = self.processor.get_braille_mappings(
+            char for word in braille_words for char in word
         )
-        word_info = cursor.fetchone()
-        
-        if word_info:
-            return dict(word_info)
-        
-        # If not a common word, return character-by-character analysis
-        analysis = {
-            'braille_pattern': braille_word,
-            'luganda_word': self.processor.translate_braille_word(braille_word),
-            'character_breakdown': []
-        }
-        
-        for char in braille_word:
-            mapping = self.processor.get_braille_mapping(char)
-            if mapping:
-                analysis['character_breakdown'].append(dict(mapping))
+
+        results = []
+        characters_cache: Dict[str, CharacterInfo] = {}
+        for word in braille_words:
+            characters = []
+            for char in word:
+                info = characters_cache.get(char)
+                if info is None:
+                    mapping = mappings.get(char)
+                    if mapping:
+                        info = CharacterInfo(char, mapping['luganda_char'], mapping['ipa_pronunciation'],
+                                             mapping['description'] or '')
+                    else:
+                        info = CharacterInfo(char, '?', None, 'Unknown character')
+                    characters_cache[char] = info
+                characters.append(info)
+
+            entry = entries.get(word)
+            if entry is not None:
+                results.append(WordAnalysis(word, entry['luganda_word'], True, entry['english_meaning'],
+                                            entry['category'], tuple(characters)))
             else:
-                analysis['character_breakdown'].append({
-                    'braille_code': char,
-                    'luganda_char': '?',
-                    'description': 'Unknown character'
-                })
-        
-        return analysis
+                luganda = ''.join(info.luganda_char for info in characters)
+                results.append(WordAnalysis(word, luganda, False, None, None, tuple(characters)))
+        return results
+
+    def suggest_corrections(self, braille_text: str, limit: int = 5,
+                            max_distance: Optional[int] = None) -> Dict[str, List[Suggestion]]:
+        """Likely intended lexicon words for each word of braille_text that is not in the lexicon"""
+        words = list(dict.fromkeys(_NON_BRAILLE.sub(' ', braille_text).split()))
+        known = self.processor.known_words(words)
+        return {word: self.processor.suggest_words(word, limit, max_distance)
+                for word in words if word not in known}
+
+    def complete_word(self, braille_prefix: str, limit: int = 5) -> List[Completion]:
+        """Most frequent lexicon words whose pattern starts with the cells typed so far"""
+        return self.processor.complete_word(_NON_BRAILLE.sub('', braille_prefix).replace(' ', ''), limit)
+
+    def get_word_details(self, braille_word: str) -> dict:
+        """Get detailed information about a Braille word"""
+        return self.analyze_words([braille_word])[0].as_dict()
     
     def close(self):
+        if self.memory is not None:
+            self.memory.close()
         self.processor.close()
 
 if __name__ == "__main__":
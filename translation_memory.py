@@ -0,0 +1,170 @@
+"""Two-tier translation memory for TranslationEngine.translate.
+
+Results are keyed by a digest of the normalized Braille input and the
+version reported by version_source (TranslationEngine combines the lexicon
+version with the translation table digest). A bounded in-process LRU sits
+in front of a persistent SQLite table, so repeated sentences are never
+translated twice and a restarted process starts warm. Rows for other
+versions are deleted when the memory is opened, and when the version
+changes the LRU is cleared and older rows are deleted again.
+
+A lookup costs a digest and, on a miss, an SQLite query, which is more
+than translating a short text, so the memory pays off for long-running
+sessions that see the same text repeatedly, and is opt-in.
+"""
+import hashlib
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
+from db_connection import ConnectionManager
+
+DEFAULT_MEMORY_PATH = 'translation_memory.db'
+# Rows written to disk in one executemany
+FLUSH_BATCH = 256
+
+
+def normalize(braille_text: str) -> str:
+    """The form translations are keyed on (NFC), which translates the same as the input"""
+    return unicodedata.normalize('NFC', braille_text)
+
+
+def memory_path_for(db_path: Union[str, Path]) -> str:
+    """Translation memory location for a lexicon database: in the same directory"""
+    return str(Path(db_path).with_name(DEFAULT_MEMORY_PATH))
+
+
+class TranslationMemory:
+    def __init__(self, path: str = DEFAULT_MEMORY_PATH, max_entries: int = 10_000,
+                 version_source: Callable[[], Union[int, str]] = lambda: 0):
+        self.max_entries = max_entries
+        self.version_source = version_source
+        self.connections = ConnectionManager(path, wal=True)
+        conn = self.connections.connection()
+        columns = {row[1]: row[2] for row in conn.execute('PRAGMA table_info(translation_memory)')}
+        if columns.get('lexicon_version', 'TEXT') != 'TEXT':
+            # Written before versions became strings; it is only a cache
+            conn.execute('DROP TABLE translation_memory')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                digest BLOB PRIMARY KEY,
+                lexicon_version TEXT NOT NULL,
+                luganda TEXT NOT NULL,
+                phonetic TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+
+        self._lru: 'OrderedDict[bytes, Tuple[str, str]]' = OrderedDict()
+        self._pending: List[Tuple[bytes, str, str, str]] = []
+        self._lock = threading.Lock()
+        self._version = None
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        # Drops rows left by runs with another lexicon or table
+        self._sync_version()
+
+    def _key(self, text: str, version: str) -> bytes:
+        data = f"{version}\0{text}".encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def _sync_version(self) -> str:
+        version = str(self.version_source())
+        if version != self._version:
+            with self._lock:
+                self._lru.clear()
+                self._pending = [row for row in self._pending if row[1] == version]
+            with self.connections.connection() as conn:
+                conn.execute('DELETE FROM translation_memory WHERE lexicon_version != ?', (version,))
+            self._version = version
+        return version
+
+    def translate(self, braille_text: str, compute: Callable[[str], Tuple[str, str]]) -> Tuple[str, str]:
+        """Cached compute(normalized braille_text)"""
+        text = normalize(braille_text)
+        version = self._sync_version()
+        key = self._key(text, version)
+
+        with self._lock:
+            result = self._lru.get(key)
+            if result is not None:
+                self._lru.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return result
+
+        row = self.connections.connection().execute(
+            'SELECT luganda, phonetic FROM translation_memory WHERE digest = ?', (key,)
+        ).fetchone()
+        if row is not None:
+            result = (row[0], row[1])
+            with self._lock:
+                self.stats['disk_hits'] += 1
+        else:
+            result = compute(text)
+            with self._lock:
+                self.stats['misses'] += 1
+            self._queue_write((key, version, result[0], result[1]))
+
+        self._remember(key, result)
+        return result
+
+    def _remember(self, key: bytes, result: Tuple[str, str]):
+        with self._lock:
+            self._lru[key] = result
+            if len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _queue_write(self, row: Tuple[bytes, str, str, str]):
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) < FLUSH_BATCH:
+                return
+            rows, self._pending = self._pending, []
+        self._write(rows)
+
+    def _write(self, rows: List[Tuple[bytes, str, str, str]]):
+        with self.connections.connection() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO translation_memory (digest, lexicon_version, luganda, phonetic) '
+                'VALUES (?, ?, ?, ?)',
+                rows
+            )
+
+    def flush(self):
+        """Write queued entries to disk"""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if rows:
+            self._write(rows)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the LRU tier"""
+        with self._lock:
+            items = list(self._lru.items())
+        return sys.getsizeof(self._lru) + sum(
+            sys.getsizeof(key) + sys.getsizeof(value) + sys.getsizeof(value[0]) + sys.getsizeof(value[1])
+            for key, value in items
+        )
+
+    def report(self) -> Dict:
+        """Hit ratios, entry counts and memory use"""
+        with self._lock:
+            stats = dict(self.stats)
+            pending = len(self._pending)
+        lookups = sum(stats.values())
+        hits = stats['memory_hits'] + stats['disk_hits']
+        disk_entries = self.connections.connection().execute(
+            'SELECT COUNT(*) FROM translation_memory'
+        ).fetchone()[0]
+        return dict(
+            stats,
+            hit_ratio=hits / lookups if lookups else 0.0,
+            miss_ratio=stats['misses'] / lookups if lookups else 0.0,
+            memory_entries=len(self._lru),
+            memory_bytes=self.memory_bytes(),
+            disk_entries=disk_entries + pending,
+        )
+
+    def close(self):
+        self.flush()
+        self.connections.close()
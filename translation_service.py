@@ -0,0 +1,322 @@
+"""Local HTTP/JSON translation service built on asyncio.
+
+Endpoints (all bodies are UTF-8 JSON unless noted):
+
+    GET  /health             -> {"status": "ok"}
+    POST /translate          {"text": "⠁⠃⠁"}           -> {"luganda": ..., "phonetic": ...}
+    POST /translate/batch    {"texts": ["⠁⠃⠁", ...]}    -> {"results": [{...}, ...]}
+    POST /translate/stream   Braille text, one line per line
+                             -> chunked NDJSON, one {"line", "luganda", "phonetic"} per line
+    POST /analyze            {"word": "⠁⠃⠁"}, {"words": [...]} or {"text": "⠁⠃⠁ ⠃⠁"}
+    POST /complete           {"prefix": "⠁⠃", "limit": 5}
+                             -> {"results": [{"braille_pattern", "luganda_word", "frequency"}, ...]}
+    POST /suggest            {"text": "⠁⠃⠁ ⠃⠁", "limit": 5}
+                             -> {"results": {word: [{"braille_pattern", "luganda_word", "distance"}, ...]}}
+                             for each word not in the lexicon
+
+Connections are kept alive (HTTP/1.1). Large batches and streams are
+translated in a process pool so the event loop keeps serving small requests.
+
+    python translation_service.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from translation_engine import TranslationEngine
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+# Batches with at least this many characters are sent to the worker pool;
+# smaller ones are cheaper to translate inline than to ship to a process
+POOL_THRESHOLD_CHARS = 8192
+# Texts per task submitted to the worker pool
+POOL_CHUNK_SIZE = 256
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error'
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class StreamAborted(Exception):
+    """A streamed response failed after its status line was sent"""
+
+
+# --- Worker pool -----------------------------------------------------------
+
+_worker_engine: Optional[TranslationEngine] = None
+
+
+def _init_worker(db_path: str):
+    global _worker_engine
+    _worker_engine = TranslationEngine(db_path, read_only=True)
+
+
+def _translate_chunk(texts: List[str]) -> List[Tuple[str, str]]:
+    """Translate a chunk of texts inside a worker process"""
+    return [_worker_engine.translate(text) for text in texts]
+
+
+# --- Service ---------------------------------------------------------------
+
+class TranslationService:
+    def __init__(self, db_path: str = 'braille_luganda.db', workers: int = 0):
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self.engine: Optional[TranslationEngine] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.routes = {
+            ('GET', '/health'): self._health,
+            ('POST', '/translate'): self._translate,
+            ('POST', '/translate/batch'): self._translate_batch,
+            ('POST', '/analyze'): self._analyze,
+            ('POST', '/complete'): self._complete,
+            ('POST', '/suggest'): self._suggest,
+        }
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        # Read-only: lexicon queries run in executor threads, each with its own connection
+        self.engine = TranslationEngine(self.db_path, read_only=True)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.db_path,)
+        )
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+        if self.engine:
+            self.engine.close()
+
+    # --- HTTP plumbing -----------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                completed = await self._dispatch(writer, method, path, body, keep_alive)
+                if not (completed and keep_alive):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Read one request; None when the client closed the connection"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request header too large")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, path, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(400, "Malformed Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Malformed Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], headers, body
+
+    async def _dispatch(self, writer, method: str, path: str, body: bytes, keep_alive: bool) -> bool:
+        """Handle one request; False when the connection must be closed"""
+        try:
+            if (method, path) == ('POST', '/translate/stream'):
+                await self._translate_stream(writer, body, keep_alive)
+                return True
+            handler = self.routes.get((method, path))
+            if handler is None:
+                known = any(route_path == path for _, route_path in self.routes)
+                raise HTTPError(405 if known else 404, f"No route for {method} {path}")
+            result = await handler(body)
+            await self._send_json(writer, 200, result, keep_alive)
+        except StreamAborted as e:
+            # The client sees the chunked body end without its last chunk
+            print(f"Service error on {method} {path}: {e.__cause__}")
+            return False
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {'error': str(e)}, keep_alive)
+        except Exception as e:
+            print(f"Service error on {method} {path}: {e}")
+            await self._send_json(writer, 500, {'error': 'Internal error'}, keep_alive)
+        return True
+
+    async def _send_json(self, writer, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+            + body
+        )
+        await writer.drain()
+
+    # --- Handlers ----------------------------------------------------------
+
+    @staticmethod
+    def _parse_json(body: bytes) -> Dict:
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+    async def _health(self, body: bytes) -> Dict:
+        return {'status': 'ok', 'workers': self.workers}
+
+    async def _translate(self, body: bytes) -> Dict:
+        text = self._parse_json(body).get('text')
+        if not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a string")
+        luganda, phonetic = self.engine.translate(text)
+        return {'luganda': luganda, 'phonetic': phonetic}
+
+    async def _translate_texts(self, texts: List[str]) -> List[Tuple[str, str]]:
+        """Translate inline for small batches, in the worker pool otherwise"""
+        if sum(map(len, texts)) < POOL_THRESHOLD_CHARS:
+            return [self.engine.translate(text) for text in texts]
+
+        loop = asyncio.get_running_loop()
+        chunks = [texts[i:i + POOL_CHUNK_SIZE] for i in range(0, len(texts), POOL_CHUNK_SIZE)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, _translate_chunk, chunk) for chunk in chunks
+        ))
+        return [pair for chunk in results for pair in chunk]
+
+    async def _translate_batch(self, body: bytes) -> Dict:
+        texts = self._parse_json(body).get('texts')
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise HTTPError(400, "'texts' must be a list of strings")
+        results = await self._translate_texts(texts)
+        return {'results': [{'luganda': l, 'phonetic': p} for l, p in results]}
+
+    async def _translate_stream(self, writer, body: bytes, keep_alive: bool):
+        """Chunked NDJSON response, written as each chunk of lines is translated"""
+        try:
+            lines = body.decode('utf-8').split('\n')
+        except UnicodeDecodeError:
+            raise HTTPError(400, "Body must be UTF-8 text")
+
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: application/x-ndjson; charset=utf-8\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+        )
+        loop = asyncio.get_running_loop()
+        pending = [
+            (start, loop.run_in_executor(self.pool, _translate_chunk, lines[start:start + POOL_CHUNK_SIZE]))
+            for start in range(0, len(lines), POOL_CHUNK_SIZE)
+        ]
+        # Chunks are submitted together but written back in input order
+        try:
+            for start, future in pending:
+                results = await future
+                data = ''.join(
+                    json.dumps({'line': start + i, 'luganda': l, 'phonetic': p}, ensure_ascii=False) + '\n'
+                    for i, (l, p) in enumerate(results)
+                ).encode('utf-8')
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                await writer.drain()
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        except Exception as e:
+            # The 200 is already sent, so no error status can follow
+            for _, future in pending:
+                future.cancel()
+            raise StreamAborted() from e
+
+    async def _analyze(self, body: bytes) -> Dict:
+        payload = self._parse_json(body)
+        if isinstance(payload.get('word'), str):
+            return await asyncio.to_thread(self.engine.get_word_details, payload['word'])
+
+        if isinstance(payload.get('text'), str):
+            words = payload['text'].split()
+        else:
+            words = payload.get('words')
+            if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+                raise HTTPError(400, "Provide 'word' or 'text' as a string or 'words' as a list of strings")
+        results = await asyncio.to_thread(self.engine.analyze_words, words)
+        return {'results': [analysis.as_dict() for analysis in results]}
+
+    async def _complete(self, body: bytes) -> Dict:
+        payload = self._parse_json(body)
+        prefix, limit = payload.get('prefix'), payload.get('limit', 5)
+        if not isinstance(prefix, str):
+            raise HTTPError(400, "'prefix' must be a string")
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            raise HTTPError(400, "'limit' must be a positive integer")
+        results = await asyncio.to_thread(self.engine.complete_word, prefix, limit)
+        return {'results': [c._asdict() for c in results]}
+
+    async def _suggest(self, body: bytes) -> Dict:
+        payload = self._parse_json(body)
+        text, limit = payload.get('text'), payload.get('limit', 5)
+        if not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a string")
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            raise HTTPError(400, "'limit' must be a positive integer")
+        results = await asyncio.to_thread(self.engine.suggest_corrections, text, limit)
+        return {'results': {word: [s._asdict() for s in suggestions] for word, suggestions in results.items()}}
+
+
+async def serve(host: str, port: int, db_path: str, workers: int):
+    service = TranslationService(db_path, workers)
+    server = await service.start(host, port)
+    print(f"Translation service listening on http://{host}:{port} ({service.workers} workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Braille to Luganda translation service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default='braille_luganda.db', help='Path to the lexicon database')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.workers))
+    except KeyboardInterrupt:
+        print("\nService stopped")
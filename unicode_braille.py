@@ -0,0 +1,76 @@
+"""Byte-level translation of UTF-8 encoded Unicode Braille files.
+
+A Braille cell U+2800-U+28FF is always encoded as E2 A0-A3 xx, where
+xx = 0x80 | dots 1-6. Removing the E2 A0 prefix of 6-dot cells therefore
+leaves exactly the engine's cell bytes (see translation_engine), so files
+are translated straight from a memory map without building a str or
+running a decoder. As in TranslationEngine.translate, cells with dot 7 or
+8 (E2 A1-A3 xx) become unknown cells and characters that are not Braille
+are dropped.
+
+    python unicode_braille.py book.txt -o book.lg.txt [--phonetic]
+"""
+import argparse
+import re
+from translation_engine import UNKNOWN_CELL, TranslationEngine
+from brf import DEFAULT_CHUNK_SIZE, iter_mmap_chunks
+
+SIX_DOT_PREFIX = b'\xe2\xa0'
+# Cells with dot 7 and/or dot 8 raised
+EIGHT_DOT_PREFIXES = (b'\xe2\xa1', b'\xe2\xa2', b'\xe2\xa3')
+_EIGHT_DOT_CELL = re.compile(rb'\xe2[\xa1-\xa3][\x80-\xbf]')
+UTF8_BOM = b'\xef\xbb\xbf'
+
+# Any other multi-byte UTF-8 sequence (accents, punctuation, ...); these are
+# removed, like ASCII other than whitespace (see compile_cell_table)
+_FOREIGN = re.compile(
+    rb'[\xc0-\xdf][\x80-\xbf]'
+    rb'|(?!\xe2[\xa0-\xa3])[\xe0-\xef][\x80-\xbf]{2}'
+    rb'|[\xf0-\xf7][\x80-\xbf]{3}'
+)
+# Deleting these leaves only UTF-8 lead bytes, i.e. foreign characters
+# (UNKNOWN_CELL, 0xC0, is never valid UTF-8, so it is deleted too)
+_ASCII_AND_CELLS = bytes(range(UNKNOWN_CELL + 1))
+
+
+def _strip_prefixes(data: bytes) -> bytes:
+    if any(prefix in data for prefix in EIGHT_DOT_PREFIXES):
+        data = _EIGHT_DOT_CELL.sub(bytes([UNKNOWN_CELL]), data)
+    return data.replace(SIX_DOT_PREFIX, b'')
+
+
+def utf8_to_cells(data: bytes) -> bytes:
+    """Convert UTF-8 Braille text to cell bytes"""
+    cells = _strip_prefixes(data)
+    if cells.translate(None, _ASCII_AND_CELLS):
+        # Slow path, only for text mixed with non-Braille characters
+        cells = _strip_prefixes(_FOREIGN.sub(b'', data))
+    return cells
+
+
+def translate_unicode_file(engine: TranslationEngine, input_path: str, output_path: str,
+                           phonetic: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Translate a UTF-8 Braille file to UTF-8 Luganda (or IPA); returns bytes read"""
+    total = 0
+    with open(output_path, 'wb') as out:
+        for chunk in iter_mmap_chunks(input_path, chunk_size):
+            if total == 0 and chunk.startswith(UTF8_BOM):
+                chunk = chunk[len(UTF8_BOM):]
+            total += len(chunk)
+            out.write(engine.translate_cells(utf8_to_cells(chunk), phonetic))
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Translate a UTF-8 Unicode Braille file to Luganda')
+    parser.add_argument('input')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--phonetic', action='store_true', help='Write IPA instead of Luganda')
+    args = parser.parse_args()
+
+    engine = TranslationEngine()
+    try:
+        size = translate_unicode_file(engine, args.input, args.output, args.phonetic)
+        print(f"Translated {size:,} bytes to {args.output}")
+    finally:
+        engine.close()